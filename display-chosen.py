@@ -1,49 +1,48 @@
-from framework import SyndromeDecoding, HypercubeSDitH, ThresholdSDitH
+import argparse
+import sys
+from framework import CHOSEN_PARAMETER_SETS, get_chosen_variant
+from framework import SearchResult, BatchSearch, Profiler
 from framework import print_title
 
-
-
-print_title('Parameter set for 128-bit security')
-sd_variant = SyndromeDecoding(251,242,126,87)
-print()
-print('======  Hypercube variant  ======')
-variant = HypercubeSDitH(sd_variant, 3, 1, 4, kappa=128)
-variant.set_tradeoff(256,17)
-variant.print(with_sd_hardness=True, in_bytes=True)
-
-print('======  Threshold variant  ======')
-variant = ThresholdSDitH(sd_variant, 7, 1, 4, kappa=128)
-variant.set_tradeoff(251,6,3)
-variant.print(with_sd_hardness=True, in_bytes=True)
-
-
-
-
-print_title('Parameter set for 192-bit security')
-sd_variant = SyndromeDecoding(251,376,220,114,2)
-print()
-print('======  Hypercube variant  ======')
-variant = HypercubeSDitH(sd_variant, 3, 1, 4, kappa=192)
-variant.set_tradeoff(256,26)
-variant.print(with_sd_hardness=True, in_bytes=True)
-
-print('======  Threshold variant  ======')
-variant = ThresholdSDitH(sd_variant, 10, 1, 4, kappa=192)
-variant.set_tradeoff(251,9,3)
-variant.print(with_sd_hardness=True, in_bytes=True)
-
-
-
-
-print_title('Parameter set for 256-bit security')
-sd_variant = SyndromeDecoding(251,494,282,156,2)
-print()
-print('======  Hypercube variant  ======')
-variant = HypercubeSDitH(sd_variant, 4, 1, 4, kappa=256)
-variant.set_tradeoff(256,34)
-variant.print(with_sd_hardness=True, in_bytes=True)
-
-print('======  Threshold variant  ======')
-variant = ThresholdSDitH(sd_variant, 13, 1, 4, kappa=256)
-variant.set_tradeoff(251,12,3)
-variant.print(with_sd_hardness=True, in_bytes=True)
+parser = argparse.ArgumentParser(description='Display the chosen SDitH parameter sets.')
+parser.add_argument('-c', '--category', nargs='+', choices=['I', 'III', 'V'], default=['I', 'III', 'V'],
+    help='security categories to display (default: all)')
+parser.add_argument('-v', '--variant', nargs='+', choices=['hypercube', 'threshold'], default=['hypercube', 'threshold'],
+    help='variants to display (default: all)')
+parser.add_argument('-f', '--format', choices=['text', 'json', 'csv'], default='text',
+    help='output format (default: text)')
+parser.add_argument('--profile', action='store_true',
+    help='print a cProfile/tracemalloc summary of ISD, SyndromeDecoding, Search and BinaryTree')
+parser.add_argument('--stats', action='store_true',
+    help='print the time spent in each function of the framework')
+args = parser.parse_args()
+
+# Keep stdout for the results when they are machine-readable
+stream = sys.stdout if args.format == 'text' else sys.stderr
+with Profiler(profile=args.profile, stats=args.stats, stream=stream):
+    specs, results = [], []
+    for parameter_set in CHOSEN_PARAMETER_SETS:
+        if parameter_set['category'] not in args.category:
+            continue
+        if args.format == 'text':
+            print_title('Parameter set for {}-bit security'.format(parameter_set['kappa']))
+            print()
+
+        for variant_name in ('hypercube', 'threshold'):
+            if variant_name not in args.variant:
+                continue
+            with_sss = (variant_name == 'threshold')
+            variant = get_chosen_variant(parameter_set, with_sss=with_sss)
+            if args.format == 'text':
+                print('======  {} variant  ======'.format(variant_name.capitalize()))
+                variant.print(with_sd_hardness=True, in_bytes=True)
+            else:
+                specs.append({'name': parameter_set['category']})
+                results.append([SearchResult.from_variant(
+                    variant, with_sss,
+                    variant.sd.get_cost_peters_isd(),
+                    variant.sd.get_cost_lee_brickell_isd(),
+                )])
+
+    if args.format != 'text':
+        BatchSearch.dump_results(BatchSearch.to_rows(specs, results), sys.stdout, args.format)
@@ -1,7 +1,36 @@
-from .isd import ISD
-from .sdp import SyndromeDecoding
-from .sdith_hypercube import HypercubeSDitH
-from .sdith_threshold import ThresholdSDitH
+# The modules are imported on first access to one of their names (PEP 562),
+#   so that a tool using only "SyndromeDecoding" does not import the whole package
+_EXPORTS = {
+    'ISD': '.isd',
+    'SyndromeDecoding': '.sdp',
+    'HypercubeSDitH': '.sdith_hypercube',
+    'ThresholdSDitH': '.sdith_threshold',
+    'ISDSurrogate': '.surrogate',
 
-from .utils import print_title
-from .search import Search
\ No newline at end of file
+    'CHOSEN_PARAMETER_SETS': '.chosen',
+    'get_chosen_variant': '.chosen',
+    'Verification': '.verify',
+    'VerificationReport': '.verify',
+
+    'Profiler': '.profiling',
+
+    'print_title': '.utils',
+    'Search': '.search',
+    'SearchResult': '.search',
+    'BatchSearch': '.batch',
+    'SensitivitySweep': '.sweep',
+    'SweepResult': '.sweep',
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+    import importlib
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value # The next accesses do not go through "__getattr__"
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
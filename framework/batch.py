@@ -0,0 +1,180 @@
+from .search import Search
+from .sdp import SyndromeDecoding
+from .sdith_hypercube import HypercubeSDitH
+import json
+import csv
+import os
+
+def _run_task(task):
+    """ Run one task of a batch (must be at the module level to be sent to the workers)
+
+        A task is a list of searches (spec_index, sub_index, with_sss, kwargs, top_k)
+        on the same (q, n), which share the caches of the process. The caches are
+        cleared at the end, since their keys contain n and cannot be reused by another task.
+    """
+    outputs = []
+    for (spec_index, sub_index, with_sss, kwargs, top_k) in task:
+        outputs.append((spec_index, sub_index, Search.run(with_sss=with_sss, top_k=top_k, **kwargs)))
+    SyndromeDecoding.clear_shared_cache()
+    HypercubeSDitH.clear_shared_cache()
+    return outputs
+
+
+class BatchSearch:
+    """ Run several searches (for example, several security categories and variants)
+        together, on a shared pool of workers.
+
+        A search specification is a dictionary with the parameters of "Search.run",
+        and the optional fields:
+          - "name": the name of the search (by default, its index)
+          - "variant": "hypercube" (default) or "threshold"
+
+        In a JSON configuration file, a range can be written as
+            {"range": [start, stop]} or {"range": [start, stop, step]}.
+
+        Each search is split into sub-searches, one per value of q and n (when they
+        are given as lists), and the sub-searches of all the searches with the same
+        (q, n) are grouped in a single task. So, the searches over the same ranges
+        (for example, both variants of a category) share the caches of the GV weights,
+        of the ISD costs and of the false positive probabilities. The caches are
+        cleared after each task (their keys contain n).
+    """
+
+    FIELDS = [
+        'name', 'variant', 'rank', 'kappa',
+        'q', 'n', 'k', 'w', 'd', 't', 'ext1', 'ext2', 'N', 'tau', 'ell',
+        'size_max', 'size_avg', 'size_std', 'security',
+        'cost_peters_isd', 'cost_lee_brickell_isd',
+    ]
+
+    @staticmethod
+    def _parse_value(value):
+        if isinstance(value, dict) and list(value.keys()) == ['range']:
+            return range(*value['range'])
+        return value
+
+    @staticmethod
+    def load_specs(path):
+        """ Load a list of search specifications from a JSON file """
+        with open(path) as f:
+            specs = json.load(f)
+        return [
+            {key: BatchSearch._parse_value(value) for key, value in spec.items()}
+            for spec in specs
+        ]
+
+    @staticmethod
+    def _split(spec_index, spec, top_k):
+        """ Return the list of (group, sub-search) of a search, where "group" is
+            (q, n), or None when q or n is not a static list (the search is then a task alone)
+        """
+        kwargs = dict(spec)
+        kwargs.pop('name', None)
+        with_sss = (kwargs.pop('variant', 'hypercube') == 'threshold')
+
+        def as_static_list(value):
+            if isinstance(value, int):
+                return [value]
+            try:
+                return list(value)
+            except TypeError:
+                return None # Dynamic list or default rule
+
+        qs = as_static_list(kwargs.get('q', 256))
+        ns = as_static_list(kwargs.get('n'))
+        if qs is None or ns is None:
+            return [(None, (spec_index, 0, with_sss, kwargs, top_k))]
+
+        subs = []
+        for q in qs:
+            for n in ns:
+                sub_kwargs = dict(kwargs)
+                sub_kwargs['q'] = q
+                sub_kwargs['n'] = n
+                subs.append(((q, n), (spec_index, len(subs), with_sss, sub_kwargs, top_k)))
+        return subs
+
+    @staticmethod
+    def run(specs, workers=None, top_k=1):
+        """ Run all the searches, and return a list with, for each specification,
+            the list of its "top_k" best parameter sets (as "SearchResult").
+
+            - workers is the number of worker processes
+                (by default, the number of CPUs; with 1, everything runs in this process)
+            - top_k is the number of parameter sets kept per search (at least 1)
+        """
+        # The value of top_k is checked by "Search.run", but it is required here
+        assert top_k is not None, 'Invalid top_k: None'
+
+        # Group the sub-searches of all the searches by (q, n)
+        tasks = []
+        groups = {}
+        for spec_index, spec in enumerate(specs):
+            for group, sub in BatchSearch._split(spec_index, spec, top_k):
+                if group is None:
+                    tasks.append([sub])
+                elif group not in groups:
+                    groups[group] = [sub]
+                    tasks.append(groups[group])
+                else:
+                    groups[group].append(sub)
+
+        workers = workers or os.cpu_count() or 1
+        if workers == 1:
+            outputs = [_run_task(task) for task in tasks]
+        else:
+            import multiprocessing
+            with multiprocessing.Pool(workers) as pool:
+                outputs = list(pool.imap_unordered(_run_task, tasks, chunksize=1))
+
+        # Merge the results of the tasks of each search. The ties are broken
+        #   as in "Search.run": higher score, then first in the search order.
+        candidates = [[] for _ in specs]
+        for task_outputs in outputs:
+            for spec_index, sub_index, results in task_outputs:
+                for rank, result in enumerate(results):
+                    candidates[spec_index].append(((result.get_size(), -result.score, sub_index, rank), result))
+        return [
+            [result for _, result in sorted(lst, key=lambda x: x[0])[:top_k]]
+            for lst in candidates
+        ]
+
+    @staticmethod
+    def to_rows(specs, results):
+        """ Flatten the output of "run" as a list of dictionaries (see "FIELDS") """
+        rows = []
+        for spec_index, (spec, spec_results) in enumerate(zip(specs, results)):
+            for rank, result in enumerate(spec_results):
+                row = {
+                    'name': spec.get('name', spec_index),
+                    'variant': 'threshold' if result.with_sss else 'hypercube',
+                    'rank': rank+1,
+                    'kappa': result.kappa,
+                    'size_max': result.sizes[0],
+                    'size_avg': result.sizes[1],
+                    'size_std': result.sizes[2],
+                    'security': result.security,
+                    'cost_peters_isd': result.cost_peters_isd,
+                    'cost_lee_brickell_isd': result.cost_lee_brickell_isd,
+                }
+                row.update(result.get_parameters())
+                rows.append({key: row.get(key) for key in BatchSearch.FIELDS})
+        return rows
+
+    @staticmethod
+    def dump_results(rows, f, fmt='json'):
+        """ Write the rows in an open file, in JSON or CSV """
+        if fmt == 'csv':
+            writer = csv.DictWriter(f, fieldnames=BatchSearch.FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+        else:
+            json.dump(rows, f, indent=2)
+            f.write('\n')
+
+    @staticmethod
+    def write_results(rows, path, fmt=None):
+        """ Write the rows in a JSON or CSV file (by default, according to the extension) """
+        fmt = fmt or ('csv' if path.endswith('.csv') else 'json')
+        with open(path, 'w', newline='') as f:
+            BatchSearch.dump_results(rows, f, fmt)
@@ -0,0 +1,48 @@
+from .sdp import SyndromeDecoding
+from .sdith_hypercube import HypercubeSDitH
+from .sdith_threshold import ThresholdSDitH
+
+# The parameter sets selected for the SDitH specifications.
+#   - "sd" is (q, n, k, w, d)
+#   - "hypercube" is (t, ext1, ext2, N, tau)
+#   - "threshold" is (t, ext1, ext2, N, tau, ell)
+CHOSEN_PARAMETER_SETS = [
+    {
+        'category': 'I',
+        'kappa': 128,
+        'sd': (251, 242, 126, 87, 1),
+        'hypercube': (3, 1, 4, 256, 17),
+        'threshold': (7, 1, 4, 251, 6, 3),
+    },
+    {
+        'category': 'III',
+        'kappa': 192,
+        'sd': (251, 376, 220, 114, 2),
+        'hypercube': (3, 1, 4, 256, 26),
+        'threshold': (10, 1, 4, 251, 9, 3),
+    },
+    {
+        'category': 'V',
+        'kappa': 256,
+        'sd': (251, 494, 282, 156, 2),
+        'hypercube': (4, 1, 4, 256, 34),
+        'threshold': (13, 1, 4, 251, 12, 3),
+    },
+]
+
+def get_chosen_variant(parameter_set, with_sss=False):
+    """ Build the SDitH object of a chosen parameter set
+        (the threshold variant if "with_sss" is True, the hypercube one otherwise)
+    """
+    (q, n, k, w, d) = parameter_set['sd']
+    sd = SyndromeDecoding(q, n, k, w, d)
+    kappa = parameter_set['kappa']
+    if with_sss:
+        (t, ext1, ext2, N, tau, ell) = parameter_set['threshold']
+        variant = ThresholdSDitH(sd, t, ext1, ext2, kappa=kappa)
+        variant.set_tradeoff(N, tau, ell)
+    else:
+        (t, ext1, ext2, N, tau) = parameter_set['hypercube']
+        variant = HypercubeSDitH(sd, t, ext1, ext2, kappa=kappa)
+        variant.set_tradeoff(N, tau)
+    return variant
@@ -10,10 +10,17 @@ class ISD:
     """
 
     @staticmethod
-    def peters_isd(n,k,q,w):
+    def peters_isd(n,k,q,w,hint=None):
         """ Stern's adaptation of ISD over Fq, due to Peters
             It returns both complexity and optimal parameters
+
+            If "hint" is the optimal (p, l) of a neighbouring instance,
+            the search starts from it (see "_peters_isd_from_hint").
+            The result is identical to the full scan.
         """
+        if hint is not None:
+            return ISD._peters_isd_from_hint(n,k,q,w,hint)
+
         x = floor(k/2)
 
         log2q=log2(q)
@@ -38,6 +45,105 @@ class ISD:
         cost -= log2(q)/2
         return cost, p, l
 
+    @staticmethod
+    def _peters_isd_from_hint(n,k,q,w,hint):
+        """ Same as "peters_isd", but the (p, l) are explored outward from "hint",
+            and the search stops in a direction as soon as a lower bound
+            on the cost of all the remaining (p, l) exceeds the current minimum.
+
+            For a given p, the cost is
+                log2(C + a*l + b/q**l) + log2(log2(q)) - log2(prob(l))
+            where C, a, b are non-negative and prob(l) is decreasing in l. So,
+              - for all l' >= l+1, the cost is at least log2(C + a*(l+1)) + ... - log2(prob(l)),
+              - for all l' <= l-1, the cost is at least log2(C + a + b/q**(l-1)) + ... - log2(prob(1)),
+              - for all l, the cost is at least log2(C + a) + ... - log2(prob(1)).
+            Ties are broken as in the full scan (smallest p, then smallest l).
+        """
+        x = floor(k/2)
+
+        log2q=log2(q)
+        log2log2q=log2(log2q)
+        max_p = min(11,floor(k/2))
+        margin = 1e-9 # Safety margin on the lower bounds (rounding errors)
+
+        def get_max_l(p, Anum):
+            return floor( log(Anum)/log(q)+p*log(q-1)/log(q))+10
+
+        # Fall back to the full scan when it would fail on some (p, l),
+        #   to keep exactly the same behaviour.
+        for p in range(1,max_p):
+            Anum=binomial(x,p)
+            Bnum=binomial(k-x,p)
+            max_l = get_max_l(p, Anum)
+            if (w-2*p < 0) or (w-2*p > n-k-max_l):
+                return ISD.peters_isd(n,k,q,w)
+            if Anum*Bnum*binomial(n-k-max_l,w-2*p)/binomial(n,w) == 0:
+                return ISD.peters_isd(n,k,q,w)
+        if max_p <= 1:
+            return ISD.peters_isd(n,k,q,w)
+
+        # Order of exploration of p: outward from the hint
+        hint_p = min(max(hint[0], 1), max_p-1)
+        ps = [hint_p]
+        for delta in range(1, max_p):
+            for p in (hint_p-delta, hint_p+delta):
+                if 1 <= p < max_p:
+                    ps.append(p)
+
+        best = (10000000, 0, 0)
+        for p in ps:
+            Anum=binomial(x,p)
+            Bnum=binomial(k-x,p)
+            max_l = get_max_l(p, Anum)
+            cst = 0.5*(n-k)**2*(n+k)
+            coeff_l = (0.5*k-p+1)+(Anum+Bnum)*(q-1)**p
+
+            def get_third_term(l):
+                return q/(q-1.)*(w-2*p+1)*2*p*(1+(q-2)/(q-1.))*Anum*Bnum*(q-1)**(2*p)/(q**l)
+            def get_prob(l):
+                return Anum*Bnum*binomial(n-k-l,w-2*p)/binomial(n,w)
+            def get_cost(l):
+                ops=cst+ coeff_l*l+ get_third_term(l)
+                prob=get_prob(l)
+                return log2(ops)+log2log2q-log2(prob), prob
+
+            log2_prob1 = log2(get_prob(1))
+            if log2(cst+coeff_l)+log2log2q-log2_prob1 > best[0]+margin:
+                continue
+
+            hint_l = min(max(hint[1], 1), max_l)
+            # Upward from the hint
+            for l in range(hint_l, max_l+1):
+                cost, prob = get_cost(l)
+                if (cost, p, l) < best:
+                    best = (cost, p, l)
+                if log2(cst+coeff_l*(l+1))+log2log2q-log2(prob) > best[0]+margin:
+                    break
+            # Downward from the hint
+            for l in range(hint_l-1, 0, -1):
+                if log2(cst+coeff_l+get_third_term(l))+log2log2q-log2_prob1 > best[0]+margin:
+                    break
+                cost, _ = get_cost(l)
+                if (cost, p, l) < best:
+                    best = (cost, p, l)
+
+        cost, p, l = best
+        cost -= log2(q)/2
+        return cost, p, l
+
+    @staticmethod
+    def peters_isd_chain(instances):
+        """ Apply "peters_isd" on a sequence of instances (n, k, q, w),
+            each one being warm-started with the optimum of the previous one.
+            It is efficient when the consecutive instances are close
+            (for example, in the lexicographic order).
+        """
+        hint = None
+        for (n,k,q,w) in instances:
+            res = ISD.peters_isd(n,k,q,w,hint=hint)
+            hint = res[1:]
+            yield res
+
     @staticmethod
     def lee_brickell_isd(n,k,q,w):
         """ Lee Brickell ISD over Fq
@@ -0,0 +1,135 @@
+import cProfile
+import pstats
+import tracemalloc
+import os
+import sys
+
+class Profiler:
+    """ Context manager to profile a piece of code using the framework
+
+      - profile: if True, collect a cProfile profile and a tracemalloc snapshot,
+          and print a summary scoped to the classes of "get_scopes"
+      - stats: if True, print the time spent in each function of the framework
+      - top is the number of lines of each summary
+      - stream is the file where the summaries are printed (by default, sys.stdout)
+
+        Example:
+
+            with Profiler(profile=True, stats=True):
+                Search.run(...)
+
+        Only the current process is profiled (not the workers of "BatchSearch").
+    """
+
+    FRAMEWORK_DIR = os.path.dirname(os.path.abspath(__file__))
+
+    def __init__(self, profile=False, stats=False, top=20, stream=None):
+        self.profile = profile
+        self.stats = stats
+        self.top = top
+        self.stream = stream
+        self._profiler = None
+        self._snapshot = None
+
+    @staticmethod
+    def get_scopes():
+        from .isd import ISD
+        from .sdp import SyndromeDecoding
+        from .search import Search
+        from .sdith_threshold import BinaryTree
+        return [ISD, SyndromeDecoding, Search, BinaryTree]
+
+    @staticmethod
+    def _get_scoped_functions():
+        """ Return the set of (filename, line, name) of the functions defined
+            in the classes of "get_scopes" (including their nested functions)
+        """
+        functions = set()
+        def add_code(code):
+            functions.add((code.co_filename, code.co_firstlineno, code.co_name))
+            for const in code.co_consts:
+                if hasattr(const, 'co_code'):
+                    add_code(const)
+        for cls in Profiler.get_scopes():
+            for attr in vars(cls).values():
+                attr = getattr(attr, '__func__', attr) # Unwrap the static methods
+                if hasattr(attr, '__code__'):
+                    add_code(attr.__code__)
+        return functions
+
+    def __enter__(self):
+        if self.profile:
+            tracemalloc.start()
+        if self.profile or self.stats:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        return self
+
+    def __exit__(self, *args):
+        if self._profiler is not None:
+            self._profiler.disable()
+        if self.profile:
+            self._snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+        if self.profile:
+            self.print_profile()
+            self.print_memory()
+        if self.stats:
+            self.print_stats()
+
+    def _print(self, *args):
+        print(*args, file=self.stream or sys.stdout)
+
+    def _get_function_stats(self, keep):
+        """ Return the list of (function, ncalls, tottime, cumtime) for the kept functions,
+            sorted by decreasing total time
+        """
+        stats = pstats.Stats(self._profiler).stats
+        rows = [
+            (func, nc, tt, ct)
+            for func, (_, nc, tt, ct, _) in stats.items()
+            if keep(func)
+        ]
+        return sorted(rows, key=lambda row: -row[2])
+
+    @staticmethod
+    def _format_function(func):
+        filename, line, name = func
+        return '{}:{}({})'.format(os.path.relpath(filename, os.path.dirname(Profiler.FRAMEWORK_DIR)), line, name)
+
+    def _print_table(self, title, rows):
+        self._print('===== {} ====='.format(title))
+        self._print('{:>10} {:>10} {:>10}  {}'.format('ncalls', 'tottime', 'cumtime', 'function'))
+        for func, nc, tt, ct in rows[:self.top]:
+            self._print('{:>10} {:>10.3f} {:>10.3f}  {}'.format(nc, tt, ct, self._format_function(func)))
+        self._print()
+
+    def print_profile(self):
+        """ Print the cProfile summary of the functions of ISD, SyndromeDecoding, Search and BinaryTree """
+        scoped = self._get_scoped_functions()
+        rows = self._get_function_stats(lambda func: func in scoped)
+        rows = sorted(rows, key=lambda row: -row[3]) # By cumulative time
+        self._print_table('Profile (ISD, SyndromeDecoding, Search, BinaryTree)', rows)
+
+    def print_memory(self):
+        """ Print the lines of ISD, SyndromeDecoding, Search and BinaryTree which allocated the most memory """
+        import inspect
+        filenames = set(inspect.getsourcefile(cls) for cls in self.get_scopes())
+        snapshot = self._snapshot.filter_traces([
+            tracemalloc.Filter(True, filename) for filename in filenames
+        ])
+        self._print('===== Memory (ISD, SyndromeDecoding, Search, BinaryTree) =====')
+        for stat in snapshot.statistics('lineno')[:self.top]:
+            frame = stat.traceback[0]
+            self._print('{:>10.1f} KiB {:>8} blocks  {}:{}'.format(
+                stat.size/1024, stat.count,
+                os.path.relpath(frame.filename, os.path.dirname(self.FRAMEWORK_DIR)), frame.lineno
+            ))
+        self._print()
+
+    def print_stats(self):
+        """ Print the time spent in each function of the framework """
+        rows = self._get_function_stats(
+            lambda func: func[0].startswith(self.FRAMEWORK_DIR + os.sep)
+        )
+        self._print_table('Time per framework function', rows)
@@ -0,0 +1,104 @@
+from math import floor, ceil, log2, log
+from math import comb as binomial
+
+class Reference:
+    """ Frozen copies of the reference implementations
+
+        These functions must NOT be optimized: they are the baseline
+        against which the fast paths of the framework are checked
+        (see "verify.py"). A silently different output may change
+        a chosen parameter set.
+    """
+
+    @staticmethod
+    def peters_isd(n,k,q,w):
+        """ Reference of "ISD.peters_isd" """
+        x = floor(k/2)
+
+        log2q=log2(q)
+        mincost=10000000
+        bestp=0
+        bestl=0
+        max_p = min(11,floor(k/2))
+        for p in range(1,max_p):
+            Anum=binomial(x,p)
+            Bnum=binomial(k-x,p)
+            for l in range(1,floor( log(Anum)/log(q)+p*log(q-1)/log(q))+10 +1):
+                ops=0.5*(n-k)**2*(n+k)+ ((0.5*k-p+1)+(Anum+Bnum)*(q-1)**p)*l+ q/(q-1.)*(w-2*p+1)*2*p*(1+(q-2)/(q-1.))*Anum*Bnum*(q-1)**(2*p)/(q**l)
+                prob=Anum*Bnum*binomial(n-k-l,w-2*p)/binomial(n,w)
+                cost=log2(ops)+log2(log2q)-log2(prob)
+                if cost<mincost:
+                    mincost=cost
+                    bestp=p; bestl=l
+
+        cost=mincost
+        p=bestp
+        l=bestl
+        cost -= log2(q)/2
+        return cost, p, l
+
+    @staticmethod
+    def compute_max_weigth_for_target(q, n, k, ratio=1/100):
+        """ Reference of "SyndromeDecoding.compute_max_weigth_for_target" """
+        right_term = q**(n-k) # target
+
+        d = 0
+        left_term = 1
+        while left_term*ceil(1/ratio) <= right_term:
+            d+=1
+            left_term += binomial(n,d)*(q-1)**d
+
+        d = d-1
+        return d
+
+    @staticmethod
+    def compute_forgery_cost(p, N, tau):
+        """ Reference of "HypercubeSDitH._compute_forgery_cost"
+            (float implementation, saturated at 512 bits)
+        """
+        def sum_pmf(tau1, tau, p):
+            return sum(
+                binomial(tau, k)*(p**k)*((1-p)**(tau-k))
+                for k in range(tau1, tau+1)
+            )
+        def inv_sum_pmf(tau1, tau, p):
+            try:
+                return 1/sum_pmf(tau1, tau, p)
+            except ZeroDivisionError:  # Too small value
+                return 2**512 # Very large value
+
+        return log2(min(
+            inv_sum_pmf(tau1, tau, p) + N**(tau-tau1)
+            for tau1 in range(0, tau+1)
+        ))
+
+    @staticmethod
+    def get_nb_leaves(nb_revealed, nb_committed, nb_experiments=1000):
+        """ Reference of "BinaryTree.get_nb_leaves" """
+        import random
+        def run_experiment(k, N):
+            logN = ceil(log2(N))
+            N_ = 2**logN
+
+            arr = [False]*N + [None]*(N_-N)
+            for idx in random.sample(list(range(N)), k):
+                arr[idx] = True
+
+            count = 0
+            for n in [2**i for i in range(logN, 0, -1)]:
+                for i in range(0, n, 2):
+                    if arr[i+1] is None:
+                        arr[i//2] = arr[i]
+                        continue
+                    if arr[i] != arr[i+1]:
+                        count += 1
+                    arr[i//2] = arr[i] and arr[i+1]
+                for i in range(n//2, n):
+                    arr[i] = None
+            count += (1 if arr[0] else 0)
+            return count
+
+        return sum([
+            run_experiment(nb_revealed,nb_committed)
+            for _ in range(nb_experiments)
+        ]) / nb_experiments
@@ -1,4 +1,5 @@
-from math import log2, ceil, sqrt
+from math import log2, ceil, sqrt, log1p, log, inf
+from itertools import count
 from math import comb as binomial
 
 class HypercubeSDitH:
@@ -11,6 +12,9 @@ class HypercubeSDitH:
       - tau is the number of iterations
       - kappa is the security level
     """
+    # Cache of the false positive probabilities, shared by all the instances of the process
+    _shared_cache = {}
+
     def __init__(self, sd, t, ext1, ext2, N=None, tau=None, kappa=128):
         self.sd = sd
         self.t = t
@@ -23,9 +27,34 @@ class HypercubeSDitH:
         self.p = None
         self.p = self.get_false_positive_probability()
 
+        # cache of the values derived from the trade-off
+        self._cache = {}
+        self._cache_key = None
+
     def set_tradeoff(self, N, tau):
         self.N = N
         self.tau = tau
+        self._refresh_cache()
+
+    def get_tradeoff(self):
+        return (self.N, self.tau)
+
+    def _refresh_cache(self):
+        """ Drop the cached values if the trade-off has changed """
+        tradeoff = self.get_tradeoff()
+        if self._cache_key != tradeoff:
+            self._cache = {}
+            self._cache_key = tradeoff
+
+    def _get_cached(self, name, compute):
+        """ Return the value 'name' derived from the current trade-off,
+            computing it with 'compute' only on the first call.
+            The cache is dropped as soon as the trade-off changes.
+        """
+        self._refresh_cache()
+        if name not in self._cache:
+            self._cache[name] = compute()
+        return self._cache[name]
 
     def get_parameters(self, as_tuple=False):
         if as_tuple:
@@ -60,13 +89,18 @@ class HypercubeSDitH:
             where "maxi" is the maximum size, "avg" is the mean size, "std" is the standard
             deviation.
         """
-        (q, _, k, w, d, t, ext1, ext2, N, tau) = self.get_parameters(as_tuple=True)
+        return self._get_cached('sig_size', self._compute_sig_size)
+
+    def _get_size_components(self):
+        """ Return the sizes (in bits) of the signature components:
+            (dig, salt, seed, last_party, comm)
+        """
+        (q, _, k, w, d, t, ext1, ext2, _, _) = self.get_parameters(as_tuple=True)
 
         # Components
         dig = 2*self.kappa # Digest
         salt = 2*self.kappa # Salt
         seed = self.kappa # Seed
-        lN = log2(N) # Height of the generation tree
         lq = ceil(log2(q))
 
         # Subparts
@@ -76,6 +110,12 @@ class HypercubeSDitH:
 
         last_party = plaintext_size + 2*poly_size + bn20_uni_cost
         comm = 2*d*bn20_uni_cost
+        return dig, salt, seed, last_party, comm
+
+    def _compute_sig_size(self):
+        (_, _, _, _, _, _, _, _, N, tau) = self.get_parameters(as_tuple=True)
+        dig, salt, seed, last_party, comm = self._get_size_components()
+        lN = log2(N) # Height of the generation tree
 
         # Upper bound on the signature size
         bitsize_maxi = dig + salt + tau*(
@@ -86,23 +126,109 @@ class HypercubeSDitH:
         size_maxi = ceil(bitsize_maxi/8)
 
         # Mean of the signature size
+        #   -> Mean number of revealed seeds of the exact distribution
+        #      (it is log2(N) when N is a power of 2)
         proba = (N-1)/N
+        nb_seeds = self._compute_repetition_distribution(N, 1)
+        nb_seeds_avg = sum(p*s for (s, _), p in nb_seeds.items())
         bitsize_avg = dig + salt + tau*(
-            seed*ceil(lN) + dig
+            seed*nb_seeds_avg + dig
             + last_party*proba
             + comm
         )
         size_avg = ceil(bitsize_avg/8)
 
         # Standard deviation of the signature size
-        #   -> This formula is valid only if n is a power of 2
-        bitsize_std = last_party * sqrt(
-            tau * proba * (1-proba)
-        )
+        #   -> Computed from the exact distribution (valid for any N)
+        bitsize_std = sqrt(tau * self._compute_repetition_variance())
         size_std = ceil(bitsize_std/8)
 
         return size_maxi, size_avg, size_std
 
+    @staticmethod
+    def get_nb_revealed_seeds(N):
+        """ Return the list of the number of seeds to reveal all the leaves
+            but the i-th one, for i in [0, N). The seed tree has 2**ceil(log2(N))
+            leaves, and its subtrees without any of the N first leaves are pruned.
+            When N is a power of 2, it is always log2(N).
+        """
+        logN = ceil(log2(N))
+        return [
+            sum(1 for h in range(logN) if (((i >> h) ^ 1) << h) < N)
+            for i in range(N)
+        ]
+
+    @staticmethod
+    def clear_shared_cache():
+        HypercubeSDitH._shared_cache.clear()
+
+    @staticmethod
+    def _compute_repetition_distribution(N, tau):
+        """ Return the distribution of (nb_seeds, nb_last) over tau repetitions, as a
+            dictionary {(nb_seeds, nb_last): probability}, where "nb_seeds" is the total
+            number of revealed seeds and "nb_last" is the number of repetitions in which
+            the share of the last party is sent (i.e. the hidden party is not the last one).
+        """
+        key = ('size_distribution', N, tau)
+        if key not in HypercubeSDitH._shared_cache:
+            # Distribution of a single repetition (the hidden party is uniform)
+            single = {}
+            for i, nb_seeds in enumerate(HypercubeSDitH.get_nb_revealed_seeds(N)):
+                value = (nb_seeds, 1 if i != N-1 else 0)
+                single[value] = single.get(value, 0) + 1/N
+
+            # Convolution over the tau repetitions
+            distribution = {(0, 0): 1.}
+            for _ in range(tau):
+                new_distribution = {}
+                for (s1, l1), p1 in distribution.items():
+                    for (s2, l2), p2 in single.items():
+                        value = (s1+s2, l1+l2)
+                        new_distribution[value] = new_distribution.get(value, 0) + p1*p2
+                distribution = new_distribution
+            HypercubeSDitH._shared_cache[key] = distribution
+        return HypercubeSDitH._shared_cache[key]
+
+    def _compute_repetition_variance(self):
+        """ Variance (in bits^2) of the size of a single repetition """
+        (_, _, _, _, _, _, _, _, N, _) = self.get_parameters(as_tuple=True)
+        _, _, seed, last_party, _ = self._get_size_components()
+        distribution = self._compute_repetition_distribution(N, 1)
+        mean = sum(p*(seed*s + last_party*l) for (s, l), p in distribution.items())
+        return sum(p*(seed*s + last_party*l - mean)**2 for (s, l), p in distribution.items())
+
+    def get_sig_size_distribution(self):
+        """ Return the exact distribution of the signature size (in bytes),
+            as a list of (size, probability) sorted by size
+        """
+        return self._get_cached('sig_size_distribution', self._compute_sig_size_distribution)
+
+    def _compute_sig_size_distribution(self):
+        (_, _, _, _, _, _, _, _, N, tau) = self.get_parameters(as_tuple=True)
+        dig, salt, seed, last_party, comm = self._get_size_components()
+        sizes = {}
+        for (nb_seeds, nb_last), proba in self._compute_repetition_distribution(N, tau).items():
+            bitsize = dig + salt + tau*(dig + comm) + seed*nb_seeds + last_party*nb_last
+            size = ceil(bitsize/8)
+            sizes[size] = sizes.get(size, 0) + proba
+        return sorted(sizes.items())
+
+    def get_sig_size_quantile(self, level):
+        """ Return the smallest size (in bytes) such that the signature
+            is not larger with probability at least "level" (for example, 0.99)
+        """
+        cumulative = 0
+        distribution = self.get_sig_size_distribution()
+        for size, proba in distribution:
+            cumulative += proba
+            if cumulative >= level - 1e-12: # Tolerance on the rounding errors
+                return size
+        return distribution[-1][0]
+
+    def get_sig_size_quantiles(self, levels=(0.5, 0.99, 0.999)):
+        """ Return a dictionary {level: quantile of the signature size (in bytes)} """
+        return {level: self.get_sig_size_quantile(level) for level in levels}
+
     @staticmethod
     def _compute_false_positive_probability(q, n, w, d, t, ext1, ext2):
         # Additional term
@@ -124,37 +250,128 @@ class HypercubeSDitH:
         if self.p is None:
             # Parameters
             (q, n, _, w, d, t, ext1, ext2, _, _) = self.get_parameters(as_tuple=True)
-            self.p = self._compute_false_positive_probability(q, n, w, d, t, ext1, ext2)
+            key = (q, n, w, d, t, ext1, ext2)
+            if key not in self._shared_cache:
+                self._shared_cache[key] = self._compute_false_positive_probability(q, n, w, d, t, ext1, ext2)
+            self.p = self._shared_cache[key]
         return self.p
 
     def get_soundness_error(self, same_randomness=False):
+        return self._get_cached(
+            ('soundness_error', same_randomness),
+            lambda: self._compute_soundness_error(same_randomness)
+        )
+
+    def _compute_soundness_error(self, same_randomness):
         (_, _, _, _, _, _, _, _, N, tau) = self.get_parameters(as_tuple=True)
         p = self.get_false_positive_probability()
         if same_randomness:
-            p+(1-p)*((1/N)**tau)
+            return p+(1-p)*((1/N)**tau)
         else:
-            (p+(1-p)/N)**tau
+            return (p+(1-p)/N)**tau
 
     @staticmethod
     def _compute_forgery_cost(p, N, tau):
-        def sum_pmf(tau1, tau, p):
-            return sum(
-                binomial(tau, k)*(p**k)*((1-p)**(tau-k))
-                for k in range(tau1, tau+1)
-            )
-        def inv_sum_pmf(tau1, tau, p):
-            try:
-                return 1/sum_pmf(tau1, tau, p)
-            except ZeroDivisionError:  # Too small value
-                return 2**512 # Very large value
-
-        return log2(min(
-            inv_sum_pmf(tau1, tau, p) + N**(tau-tau1)
-            for tau1 in range(0, tau+1)
-        ))
+        """ Return the cost (in bits) of a forgery with tau repetitions of N parties,
+            when the false positive probability is p (clipped to [0, 1]).
+            It is computed in log space (see "_compute_log_forgery_cost"), so it
+            neither saturates nor overflows (the float implementation is kept
+            in "Reference.compute_forgery_cost").
+        """
+        log_p, log_1mp = HypercubeSDitH._get_log_probabilities(p)
+        return HypercubeSDitH._compute_log_forgery_cost(log_p, log_1mp, log2(N), tau)
+
+    @staticmethod
+    def _get_log_probabilities(p):
+        """ Return (log2(p), log2(1-p)), for p clipped to [0, 1] """
+        if p >= 1:
+            return 0., -inf
+        return (log2(p) if p > 0 else -inf), log1p(-p)/log(2)
+
+    @staticmethod
+    def _get_log_binomials(tau):
+        """ Return the list of log2(binomial(tau, i)) for i in [0, tau] """
+        key = ('log_binomials', tau)
+        if key not in HypercubeSDitH._shared_cache:
+            HypercubeSDitH._shared_cache[key] = [log2(binomial(tau, i)) for i in range(tau+1)]
+        return HypercubeSDitH._shared_cache[key]
+
+    @staticmethod
+    def _log2_add(a, b):
+        """ Return log2(2**a + 2**b) """
+        if a < b:
+            a, b = b, a
+        if b == -inf or a == inf:
+            return a
+        return a + log2(1 + 2**(b-a))
+
+    @staticmethod
+    def _compute_log_forgery_cost(log_p, log_1mp, log_N, tau):
+        """ Return the forgery cost from log2(p), log2(1-p) and log2(N). The tail
+            probabilities are never rounded to zero, so the cost does not saturate.
+        """
+        log_binomials = HypercubeSDitH._get_log_binomials(tau)
+        cost = inf
+        log_tail = -inf # log2 of the probability to pass at least tau1 repetitions
+        for tau1 in range(tau, -1, -1):
+            log_pmf = log_binomials[tau1]
+            if tau1 > 0:
+                log_pmf += tau1*log_p
+            if tau1 < tau:
+                log_pmf += (tau-tau1)*log_1mp
+            log_tail = HypercubeSDitH._log2_add(log_tail, log_pmf)
+            cost = min(cost, HypercubeSDitH._log2_add(-log_tail, (tau-tau1)*log_N))
+        return cost
+
+    @staticmethod
+    def compute_min_tau(ps, N, kappa, taus=None):
+        """ Return, for each false positive probability of "ps" (for example,
+            one per value of t), the minimal number of repetitions such that
+            the forgery cost is at least kappa bits, or None if there is none in "taus".
+
+            - N is the number of parties
+            - taus is the increasing range of the explored values of tau
+                (by default, from ceil(kappa/log2(N)), without upper bound)
+
+            The forgery costs are computed in log space (see "_compute_log_forgery_cost"),
+            and the binomial coefficients are shared by all the probabilities.
+            When p >= 1 (conservative bound of the threshold variant), a forgery
+            costs at most one bit whatever tau, and the result is None.
+        """
+        memoize = (taus is None)
+        if taus is None:
+            taus = count(ceil(kappa / log2(N)))
+        log_N = log2(N)
+
+        min_taus = [None]*len(ps)
+        pending = []
+        for i, p in enumerate(ps):
+            key = ('min_tau', p, N, kappa)
+            if memoize and key in HypercubeSDitH._shared_cache:
+                min_taus[i] = HypercubeSDitH._shared_cache[key]
+            elif p < 1:
+                pending.append((i, p) + HypercubeSDitH._get_log_probabilities(p))
+
+        for tau in taus:
+            if len(pending) == 0:
+                break
+            still_pending = []
+            for i, p, log_p, log_1mp in pending:
+                cost = HypercubeSDitH._compute_log_forgery_cost(log_p, log_1mp, log_N, tau)
+                if cost >= kappa:
+                    min_taus[i] = tau
+                    if memoize:
+                        HypercubeSDitH._shared_cache[('min_tau', p, N, kappa)] = tau
+                else:
+                    still_pending.append((i, p, log_p, log_1mp))
+            pending = still_pending
+        return min_taus
 
     def get_signature_security(self):
         """ Return the security of the signature in bits """
+        return self._get_cached('signature_security', self._compute_signature_security)
+
+    def _compute_signature_security(self):
         (_, _, _, _, _, _, _, _, N, tau) = self.get_parameters(as_tuple=True)
         p = self.get_false_positive_probability()
         return self._compute_forgery_cost(p, N, tau)
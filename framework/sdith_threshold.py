@@ -12,6 +12,10 @@ class ThresholdSDitH(HypercubeSDitH):
         self.N = N
         self.tau = tau
         self.ell = ell
+        self._refresh_cache()
+
+    def get_tradeoff(self):
+        return (self.N, self.tau, self.ell)
 
     def get_parameters(self, as_tuple=False):
         res = super().get_parameters(as_tuple=as_tuple)
@@ -26,20 +30,22 @@ class ThresholdSDitH(HypercubeSDitH):
         if self.p is None:
             # Parameters
             (q, n, _, w, d, t, ext1, ext2, _, _, _) = self.get_parameters(as_tuple=True)
-            self.p = self._compute_false_positive_probability(q, n, w, d, t, ext1, ext2)
+            key = (q, n, w, d, t, ext1, ext2)
+            if key not in self._shared_cache:
+                self._shared_cache[key] = self._compute_false_positive_probability(q, n, w, d, t, ext1, ext2)
+            self.p = self._shared_cache[key]
         return self.p
 
     def can_use_same_unif(self):
+        return self._get_cached('same_unif', self._compute_can_use_same_unif)
+
+    def _compute_can_use_same_unif(self):
         (_, _, _, _, _, _, _, _, N, tau, ell) = self.get_parameters(as_tuple=True)
         p = self.get_false_positive_probability()
         p_ = tau*p*binomial(N, ell+1) # Conservative
         return (log2(p_)) <= -self.kappa
 
-    def get_sig_size(self):
-        """ Return the signature size in bytes. More precisely, it returns (maxi, avg, std)
-            where "maxi" is the maximum size, "avg" is the mean size, "std" is the standard
-            deviation.
-        """
+    def _compute_sig_size(self):
         (q, _, k, w, d, t, ext1, ext2, N, tau, ell) = self.get_parameters(as_tuple=True)
         same_unif = self.can_use_same_unif()
 
@@ -90,13 +96,27 @@ class ThresholdSDitH(HypercubeSDitH):
 
         return size_maxi, size_avg, size_std
 
-    def get_signature_security(self):
-        """ Return the security of the signature in bits """
+    def get_sig_size_distribution(self):
+        """ Not Implemented: only the average number of revealed seeds
+            is computed (see "BinaryTree.get_nb_leaves")
+        """
+        raise NotImplementedError('The size distribution is only available for the hypercube variant')
+
+    def _compute_signature_security(self):
         (_, _, _, _, _, _, _, _, N, tau, ell) = self.get_parameters(as_tuple=True)
         p = self.get_false_positive_probability()
         p *= binomial(N, ell+1) # Conservative
         return self._compute_forgery_cost(p, binomial(N, ell), tau)
 
+    @staticmethod
+    def compute_min_tau(ps, N, ell, kappa, taus=None):
+        """ Same as "HypercubeSDitH.compute_min_tau" for the threshold variant
+            with the parameter "ell" (see "_compute_signature_security")
+        """
+        return HypercubeSDitH.compute_min_tau(
+            [p*binomial(N, ell+1) for p in ps], binomial(N, ell), kappa, taus
+        )
+
     def print(self, in_bytes=False, new_line=True, with_sd_hardness=False):
         text = []
         (q, m, k, w, d, t, ext1, ext2, N, tau, ell) = self.get_parameters(as_tuple=True)
@@ -166,33 +186,35 @@ class BinaryTree:
         import math
         return floor((N-x)*math.log2(N/(N-x))) if x < N else 1
         
+    # Cache of the average number of revealed seeds, shared by all the instances of the process
+    _shared_cache = {}
+
     @staticmethod
-    def get_nb_leaves(nb_revealed, nb_committed, nb_experiments=1000):
-        """ Get average cost to reveal the seeds """
-        import random
-        def run_experiment(k, N):
-            logN = ceil(log2(N))
-            N_ = 2**logN
-
-            arr = [False]*N + [None]*(N_-N)
-            for idx in random.sample(list(range(N)), k):
-                arr[idx] = True
-
-            count = 0
-            for n in [2**i for i in range(logN, 0, -1)]:
-                for i in range(0, n, 2):
-                    if arr[i+1] is None:
-                        arr[i//2] = arr[i]
-                        continue
-                    if arr[i] != arr[i+1]:
-                        count += 1
-                    arr[i//2] = arr[i] and arr[i+1]
-                for i in range(n//2, n):
-                    arr[i] = None
-            count += (1 if arr[0] else 0)
-            return count
-
-        return sum([
-            run_experiment(nb_revealed,nb_committed)
-            for _ in range(nb_experiments)
-        ]) / nb_experiments
+    def get_nb_leaves(nb_revealed, nb_committed):
+        """ Get average cost to reveal the seeds
+
+            It is the exact expectation (for a uniformly random set of "nb_revealed"
+            leaves among "nb_committed") of the number of seeds sent for the tree:
+            one per node with two subtrees such that exactly one is fully revealed,
+            plus one if all the leaves are revealed.
+        """
+        key = (nb_revealed, nb_committed)
+        if key not in BinaryTree._shared_cache:
+            k, N = key
+            nb_subsets = binomial(N, k)
+            def proba_revealed(m):
+                # Probability that m given leaves are all revealed
+                return binomial(N-m, k-m) / nb_subsets if m <= k else 0.
+
+            expectation = proba_revealed(N)
+            for h in range(1, ceil(log2(N))+1):
+                size = 2**h
+                for start in range(0, N, size):
+                    nb_left = min(size//2, N-start)
+                    nb_right = min(size, N-start) - size//2
+                    if nb_right <= 0:
+                        continue # The right subtree has no leaf
+                    expectation += proba_revealed(nb_left) + proba_revealed(nb_right) \
+                        - 2*proba_revealed(nb_left + nb_right)
+            BinaryTree._shared_cache[key] = expectation
+        return BinaryTree._shared_cache[key]
@@ -10,26 +10,37 @@ class SyndromeDecoding:
       - k is the code dimension
       - w is the weight contraint
       - d is the split factor (d=1 for standard SD instance)
+      - isd_hint is an optional optimal (p, l) of a neighbouring instance,
+          used to warm-start the estimation of the Peters ISD cost
     """
 
-    def __init__(self, q, n, k, w, d=1):
+    # Cache shared by all the instances of the process (GV weights, ISD costs)
+    _shared_cache = {}
+
+    def __init__(self, q, n, k, w, d=1, isd_hint=None):
         self.q = q
         self.n = n
         self.k = k
         self.w = w
         self.d = d
+        self.isd_hint = isd_hint
 
         # cache
         self._cost_peters_isd = None
         self._cost_lee_brickell_isd = None
         assert (n % d == 0) and (w % d == 0)
 
+    @staticmethod
+    def compute_security_loss_from_split(n, w, d):
+        key = ('split', n, w, d)
+        if key not in SyndromeDecoding._shared_cache:
+            split_n = n // d
+            split_w = w // d
+            SyndromeDecoding._shared_cache[key] = log2(binomial(n,w)) - log2(binomial(split_n,split_w)**d)
+        return SyndromeDecoding._shared_cache[key]
+
     def get_security_loss_from_split(self):
-        from math import log2
-        from math import comb as binomial
-        split_n = self.n // self.d
-        split_w = self.w // self.d
-        return log2(binomial(self.n,self.w)) - log2(binomial(split_n,split_w)**self.d)
+        return self.compute_security_loss_from_split(self.n, self.w, self.d)
 
     @staticmethod
     def compute_max_weigth_for_target(q, n, k, ratio=1/100):
@@ -49,6 +60,10 @@ class SyndromeDecoding:
             or equivently,
                 left_term * (1/ratio) <= right_term.
         """
+        key = ('gv', q, n, k, ratio)
+        if key in SyndromeDecoding._shared_cache:
+            return SyndromeDecoding._shared_cache[key]
+
         right_term = q**(n-k) # target
 
         d = 0
@@ -66,6 +81,7 @@ class SyndromeDecoding:
         #   such that left_term / right_term > ratio,
         #   so we must take the previous one.
         d = d-1
+        SyndromeDecoding._shared_cache[key] = d
         return d
 
     def get_max_weight_for_target(self, ratio=1/100):
@@ -95,7 +111,10 @@ class SyndromeDecoding:
     
     def get_cost_peters_isd(self, with_parameters=False):
         if self._cost_peters_isd is None:
-            self._cost_peters_isd = ISD.peters_isd(self.n,self.k,self.q,self.w)
+            key = ('peters', self.n, self.k, self.q, self.w)
+            if key not in self._shared_cache:
+                self._shared_cache[key] = ISD.peters_isd(self.n,self.k,self.q,self.w,hint=self.isd_hint)
+            self._cost_peters_isd = self._shared_cache[key]
         cost, p, ell = self._cost_peters_isd
         if with_parameters:
             return cost, (p, ell)
@@ -103,10 +122,17 @@ class SyndromeDecoding:
 
     def get_cost_lee_brickell_isd(self):
         if self._cost_lee_brickell_isd is None:
-            self._cost_lee_brickell_isd = ISD.lee_brickell_isd(self.n,self.k,self.q,self.w)
+            key = ('lee_brickell', self.n, self.k, self.q, self.w)
+            if key not in self._shared_cache:
+                self._shared_cache[key] = ISD.lee_brickell_isd(self.n,self.k,self.q,self.w)
+            self._cost_lee_brickell_isd = self._shared_cache[key]
         cost = self._cost_lee_brickell_isd
         return cost - self.get_security_loss_from_split()
 
+    @staticmethod
+    def clear_shared_cache():
+        SyndromeDecoding._shared_cache.clear()
+
     def get_isd_cost(self):
         cost_peters_isd = self.get_cost_peters_isd()
         cost_lee_brickell_isd = self.get_cost_lee_brickell_isd()
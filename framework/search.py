@@ -1,8 +1,89 @@
 from .sdp import SyndromeDecoding
 from .sdith_hypercube import HypercubeSDitH
 from .sdith_threshold import ThresholdSDitH
-from math import floor, ceil, log2
-from math import comb as binomial
+from .surrogate import ISDSurrogate
+from math import floor
+import heapq
+
+class SearchResult:
+    """ Compact and immutable record of a parameter set found by the search
+
+      - parameters is the tuple returned by "get_parameters(as_tuple=True)"
+      - kappa is the security level
+      - with_sss is True for the threshold variant
+      - sizes is the triple (maxi, avg, std) returned by "get_sig_size"
+      - security is the forgery cost (in bits)
+      - cost_peters_isd and cost_lee_brickell_isd are the ISD costs (in bits),
+          or None if they were not estimated during the search
+      - score is the value of the score function
+      - size is the size (in bytes) minimized by the search
+          (by default, the average size)
+
+      The SDitH object is only built on request, with "get_variant".
+    """
+    __slots__ = (
+        'parameters', 'kappa', 'with_sss', 'sizes', 'security',
+        'cost_peters_isd', 'cost_lee_brickell_isd', 'score', 'size',
+    )
+
+    def __init__(self, parameters, kappa, with_sss, sizes, security,
+            cost_peters_isd=None, cost_lee_brickell_isd=None, score=0, size=None):
+        if size is None:
+            size = sizes[1]
+        for key, value in zip(self.__slots__, (
+                tuple(parameters), kappa, with_sss, tuple(sizes), security,
+                cost_peters_isd, cost_lee_brickell_isd, score, size)):
+            object.__setattr__(self, key, value)
+
+    def __setattr__(self, key, value):
+        raise AttributeError('SearchResult is immutable')
+
+    def __delattr__(self, key):
+        raise AttributeError('SearchResult is immutable')
+
+    def __reduce__(self):
+        return (SearchResult, tuple(getattr(self, key) for key in self.__slots__))
+
+    def __repr__(self):
+        return 'SearchResult(parameters={}, size={})'.format(self.parameters, self.get_size())
+
+    @staticmethod
+    def from_variant(variant, with_sss, cost_peters_isd=None, cost_lee_brickell_isd=None, score=0, size=None):
+        return SearchResult(
+            variant.get_parameters(as_tuple=True),
+            variant.kappa,
+            with_sss,
+            variant.get_sig_size(),
+            variant.get_signature_security(),
+            cost_peters_isd,
+            cost_lee_brickell_isd,
+            score,
+            size,
+        )
+
+    def get_parameters(self):
+        """ Return the parameters as a dictionary (as "get_parameters" of the variants) """
+        keys = ['q', 'n', 'k', 'w', 'd', 't', 'ext1', 'ext2', 'N', 'tau']
+        if self.with_sss:
+            keys.append('ell')
+        return dict(zip(keys, self.parameters))
+
+    def get_size(self):
+        """ Return the signature size minimized by the search (in bytes) """
+        return self.size
+
+    def get_variant(self):
+        """ Build the SDitH object described by the record """
+        (q, n, k, w, d, t, ext1, ext2, N, tau) = self.parameters[:10]
+        sd = SyndromeDecoding(q, n, k, w, d=d)
+        if self.with_sss:
+            variant = ThresholdSDitH(sd, t, ext1, ext2, kappa=self.kappa)
+            variant.set_tradeoff(N, tau, self.parameters[10])
+        else:
+            variant = HypercubeSDitH(sd, t, ext1, ext2, kappa=self.kappa)
+            variant.set_tradeoff(N, tau)
+        return variant
+
 
 class Search:
 
@@ -13,9 +94,12 @@ class Search:
             constraints.
 
             Return: a couple (size, variant)
-                where "size" is the best achieved size (in bytes)
+                where "size" is the best achieved size (in bytes, see "size_metric")
                 and "variant" is a SDitH object which describes
                     the best parameter sets.
+            If "top_k" is given, return instead the list of the "top_k" best
+                parameter sets, as "SearchResult" records sorted from the best
+                to the worst. Only these records are kept during the search.
 
             Mandatory parameters:
               - the code length: "n"
@@ -26,12 +110,16 @@ class Search:
             Optional parameters:
               - the field size |F_sd|: "q"
                     by default,  q=256
+              - the split factor of the SD instance: "d"
+                    by default: d=1 (standard SD instance).
+                    The values which do not divide n are skipped.
               - the code weight: "w"
                     by default: w=-1
                     [Remark] if the value is negative, then it means that it is relative
                       to the GV bound. For example, "-2" means "GV-2".
               - the extension degree between F_sd and F_poly: "ext1"
-                    by default: the minimal value such that |F_poly| >= m
+                    by default: the minimal value such that |F_poly| >= m/d
+                    The values such that |F_poly| < m/d are skipped.
               - the extension degree between F_poly and F_point: "ext2"
                     by default: the minimal value such that |F_points| >= 2^24
               - the number of evaluations: "t"
@@ -43,8 +131,25 @@ class Search:
               - a score function: "get_score". By default, it is the zero function.
                     if two parameter sets lead to the same signature size, it applies the score
                     function, and keep the parameter set with the higher score.
+              - the number of parameter sets to return: "top_k"
+                    by default: None (only the best parameter set is returned), otherwise at least 1
+              - a list of precomputed ISD cost surfaces: "isd_surrogates" (see "ISDSurrogate")
+                    by default: None. When a surface covers the instance, the instances whose
+                    certified upper bound on the Peters cost (see "ISDSurrogate.get_upper_bound")
+                    is below "lda" are discarded without running the exact estimator.
+                    The other instances always run the exact estimator.
+              - the signature size to minimize: "size_metric"
+                    by default: 'avg' (the average size). It can also be 'max' (the maximal size),
+                    or a quantile level such as 0.99 (the 99th percentile of the exact size
+                    distribution, only available for the hypercube variant).
+              - the warm start of the Peters ISD estimation: "warm_start_isd"
+                    by default: True. The estimation of each instance starts from the
+                    optimal (p, l) of the previous one (it gives the same costs).
 
-            Order of the selection: q, n, k, w, ext1, ext2, t, N, tau
+            Order of the selection: q, n, d, ext1, ext2, k, w, t, N, tau
+                (the combinations of q, n, d and ext1 which are not compatible are rejected
+                before computing any GV weight or ISD cost, and the GV weights and ISD costs
+                are shared between the different values of d)
 
             Format of the parameters:
               - it can be an integer: the value is fixed
@@ -75,6 +180,37 @@ class Search:
 
         estimate_peters_isd = kwargs.pop('estimate_peters_isd', True)
         estimate_lee_brickell_isd = kwargs.pop('estimate_lee_brickell_isd', True)
+        top_k = kwargs.pop('top_k', None)
+        assert top_k is None or (isinstance(top_k, int) and top_k >= 1), 'Invalid top_k: {}'.format(top_k)
+        isd_surrogates = kwargs.pop('isd_surrogates', None)
+        warm_start_isd = kwargs.pop('warm_start_isd', True)
+        size_metric = kwargs.pop('size_metric', 'avg')
+        assert size_metric in ('avg', 'max') or (0 < size_metric < 1), 'Invalid size metric: {}'.format(size_metric)
+        assert size_metric in ('avg', 'max') or not with_sss, 'The size quantiles are only available for the hypercube variant'
+        isd_hint = [None] # Optimal (p, l) of the last estimated instance
+
+        # Bounded heap of the "top_k" best records, the root is the worst one.
+        #   Ties on the size are broken with the score, then by keeping
+        #   the parameter set found first (as for the best one).
+        heap = []
+        counter = [0]
+        def record(size, variant, params):
+            score = get_score(variant)
+            key = (-size, score, -counter[0])
+            counter[0] += 1
+            if len(heap) >= top_k and key <= heap[0][0]:
+                return
+            entry = (key, SearchResult.from_variant(
+                variant, with_sss,
+                params.get('cost_peters_isd'),
+                params.get('cost_lee_brickell_isd'),
+                score,
+                size,
+            ))
+            if len(heap) < top_k:
+                heapq.heappush(heap, entry)
+            else:
+                heapq.heapreplace(heap, entry)
 
         def aux(lst, params):
             if len(lst) == 0:
@@ -87,7 +223,14 @@ class Search:
                     variant.set_tradeoff(N,tau, params['ell'])
                 else:
                     variant.set_tradeoff(N,tau)
-                size = variant.get_sig_size()[1] # Take the average
+                if size_metric == 'avg':
+                    size = variant.get_sig_size()[1] # Take the average
+                elif size_metric == 'max':
+                    size = variant.get_sig_size()[0]
+                else:
+                    size = variant.get_sig_size_quantile(size_metric)
+                if top_k:
+                    record(size, variant, params)
                 return size, variant
 
             # When it remains at least one parameter to select
@@ -121,7 +264,17 @@ class Search:
                         if value <= 0:
                             value += new_params['gv']
                     new_params[key] = value
-                    if key == 'k':
+                    if key == 'd':
+                        # Reject the split factors which do not divide the code length,
+                        #   before any GV or ISD computation
+                        if params['n'] % value != 0:
+                            continue
+                    elif key == 'ext1':
+                        # Reject the extension degrees such that |F_poly| < n/d,
+                        #   before any GV or ISD computation
+                        if params['q']**value < params['n']/params['d']:
+                            continue
+                    elif key == 'k':
                         # After choosing q, n and k, let directly compute the GV distance
                         new_params['gv'] = floor(SyndromeDecoding.compute_max_weigth_for_target(
                             params['q'],
@@ -138,12 +291,28 @@ class Search:
                                 params['n'],
                                 params['k'],
                                 new_params['w'],
-                                d=params['d']
+                                d=params['d'],
+                                isd_hint=isd_hint[0] if warm_start_isd else None
                             )
                         except AssertionError:
                             continue
+                        surrogate = ISDSurrogate.find(isd_surrogates, params['q'])
+                        if estimate_peters_isd and surrogate is not None:
+                            # Discard the instance when the certified upper bound of the
+                            #   surrogate surface is below "lda". The kept instances always
+                            #   run the exact estimator.
+                            upper = surrogate.get_upper_bound(params['n'], params['k'], new_params['w'])
+                            if upper is not None:
+                                upper -= new_params['sd'].get_security_loss_from_split()
+                                if upper < params['lda']:
+                                    continue
                         cost1 = new_params['sd'].get_cost_peters_isd() if estimate_peters_isd else params['lda']
+                        if estimate_peters_isd:
+                            # The optimum of this instance is the hint of the next one
+                            isd_hint[0] = new_params['sd'].get_cost_peters_isd(with_parameters=True)[1]
                         cost2 = new_params['sd'].get_cost_lee_brickell_isd() if estimate_lee_brickell_isd else params['lda']
+                        new_params['cost_peters_isd'] = cost1 if estimate_peters_isd else None
+                        new_params['cost_lee_brickell_isd'] = cost2 if estimate_lee_brickell_isd else None
                         if min(cost1, cost2) < params['lda']:
                             continue
                     elif key == 't':
@@ -204,20 +373,20 @@ class Search:
                     return aux(lst, new_params)
 
                 elif key == 'tau':
+                    # Minimal tau such that the signature security is at least kappa
+                    #   (computed in log space, and shared by the searches of the process)
                     N = params['N']
+                    p = params['variant'].get_false_positive_probability()
+                    if with_sss:
+                        tau = ThresholdSDitH.compute_min_tau([p], N, params['ell'], params['kappa'])[0]
+                    else:
+                        tau = HypercubeSDitH.compute_min_tau([p], N, params['kappa'])[0]
+                    if tau is None:
+                        return None, None
                     if with_sss:
-                        ell = params['ell']
-                        tau = ceil(params['kappa'] / log2(binomial(N,ell)))
-                        params['variant'].set_tradeoff(N,tau,ell)
+                        params['variant'].set_tradeoff(N,tau,params['ell'])
                     else:
-                        tau = ceil(params['kappa'] / log2(N))
                         params['variant'].set_tradeoff(N,tau)
-                    while params['variant'].get_signature_security() < params['kappa']:
-                        tau += 1
-                        if with_sss:
-                            params['variant'].set_tradeoff(N,tau,params['ell'])
-                        else:
-                            params['variant'].set_tradeoff(N,tau)
                     new_params = params.copy()
                     new_params[key] = tau
                     return aux(lst, new_params)
@@ -228,17 +397,17 @@ class Search:
         # The list of parameter selection
         kappa = kwargs.pop('kappa')
         lda = kwargs.pop('lda')
-        d = kwargs.pop('d', 1)
         nb_additional = kwargs.pop('nb_additional', 1)
         get_score = kwargs.pop('get_score', lambda x: 0)
         if with_sss:
             lst = [
                 ('q', kwargs.pop('q', 256)),
                 ('n', kwargs.pop('n')), # No default
-                ('k', kwargs.pop('k')), # No default
-                ('w', kwargs.pop('w', [-1])),
+                ('d', kwargs.pop('d', 1)),
                 ('ext1', kwargs.pop('ext1', None)),
                 ('ext2', kwargs.pop('ext2', None)),
+                ('k', kwargs.pop('k')), # No default
+                ('w', kwargs.pop('w', [-1])),
                 ('t', kwargs.pop('t', 1)),
                 ('N', kwargs.pop('N', 256)),
                 ('ell', kwargs.pop('ell', 1)),
@@ -248,10 +417,11 @@ class Search:
             lst = [
                 ('q', kwargs.pop('q', 256)),
                 ('n', kwargs.pop('n')), # No default
-                ('k', kwargs.pop('k')), # No default
-                ('w', kwargs.pop('w', [-1])),
+                ('d', kwargs.pop('d', 1)),
                 ('ext1', kwargs.pop('ext1', None)),
                 ('ext2', kwargs.pop('ext2', None)),
+                ('k', kwargs.pop('k')), # No default
+                ('w', kwargs.pop('w', [-1])),
                 ('t', kwargs.pop('t', 1)),
                 ('N', kwargs.pop('N', 256)),
                 ('tau', kwargs.pop('tau', None)),
@@ -259,4 +429,163 @@ class Search:
         assert len(kwargs) == 0, 'Unknown parameters: {}'.format(list(kwargs.keys()))
 
         # Launch the exhaustive search
-        return aux(lst, {'kappa': kappa, 'lda': lda, 'd': d, 'nb_additional': nb_additional, 'get_score': get_score})
+        best = aux(lst, {'kappa': kappa, 'lda': lda, 'nb_additional': nb_additional, 'get_score': get_score})
+        if top_k:
+            return [entry[1] for entry in sorted(heap, reverse=True)]
+        return best
+
+
+    @staticmethod
+    def local_search(seeds=None, time_budget=None, seed=0, max_iterations=500,
+            window=2, temperature=0.01, cooling=0.99, penalty=0.05, with_sss=False, **kwargs):
+        """ Perform a local search (simulated annealing) to find a short
+            signature size in a large parameter space, and confirm the result
+            with an exhaustive search around the winner.
+
+            It accepts the same parameters as "Search.run". The parameters
+            among q, n, d, k, w, t, N and ell which are given as (static) lists
+            define the search space. The others (including the dynamic lists)
+            are passed unchanged to "Search.run", which is used to evaluate each point.
+
+              - seeds is a list of starting points, as dictionaries
+                    (for example, {'n': 242, 'k': 126, 't': 3}).
+                    A missing parameter starts at the end of its list, and a value
+                    which is not in the list is replaced by the closest one.
+                    By default: the chosen parameter sets with the same "kappa".
+              - time_budget is an optional maximal running time of the local search
+                    (in seconds). By default: None (no time limit).
+              - seed is the seed of the PRNG
+              - max_iterations is the number of moves. The search is reproducible
+                    for a given seed (for both variants, since the signature sizes are
+                    deterministic), unless it is stopped by the time budget.
+              - window is the half-width (in number of values of each list)
+                    of the exhaustive search run around the winner
+              - temperature is the initial temperature, relatively to the size of the seed
+              - cooling is the factor applied to the temperature after each move
+              - penalty is the relative size penalty per missing bit of ISD cost:
+                    the points below "lda" are visited with a penalized size,
+                    so that the search can cross them, but are never selected.
+
+            Return: the output of "Search.run" on the confirmation window.
+        """
+        import random
+        import time
+        from math import exp
+        from .chosen import CHOSEN_PARAMETER_SETS
+
+        rng = random.Random(seed)
+        top_k = kwargs.pop('top_k', None)
+        lda = kwargs['lda']
+
+        # Split the parameters into the search space and the fixed ones
+        space = {}
+        for key in ('q', 'n', 'd', 'k', 'w', 't', 'N', 'ell'):
+            if key in kwargs and not isinstance(kwargs[key], int) and not callable(kwargs[key]):
+                values = sorted(list(kwargs.pop(key)))
+                if len(values) == 1:
+                    kwargs[key] = values[0]
+                else:
+                    space[key] = values
+        keys = list(space.keys())
+        assert len(keys) > 0, 'No parameter to search'
+
+        # Evaluation of a point, without the constraint on the ISD cost
+        evaluation_kwargs = kwargs.copy()
+        evaluation_kwargs['lda'] = float('-inf')
+        evaluation_kwargs.pop('isd_surrogates', None)
+        evaluations = {}
+        def evaluate(point):
+            """ Return (objective, is_feasible) for a tuple of indexes in the search space """
+            if point not in evaluations:
+                selected = {key: space[key][idx] for key, idx in zip(keys, point)}
+                results = Search.run(with_sss=with_sss, top_k=1, **evaluation_kwargs, **selected)
+                if len(results) == 0:
+                    evaluations[point] = (float('inf'), False)
+                else:
+                    result = results[0]
+                    costs = [
+                        cost for cost in (result.cost_peters_isd, result.cost_lee_brickell_isd)
+                        if cost is not None
+                    ]
+                    deficit = max(lda - min(costs), 0) if len(costs) > 0 else 0
+                    size = result.get_size()
+                    evaluations[point] = (size*(1 + penalty*deficit), deficit == 0)
+            return evaluations[point]
+
+        def get_closest_index(key, value):
+            values = space[key]
+            return min(range(len(values)), key=lambda idx: abs(values[idx]-value))
+
+        if seeds is None:
+            seeds = []
+            for parameter_set in CHOSEN_PARAMETER_SETS:
+                if parameter_set['kappa'] != kwargs.get('kappa'):
+                    continue
+                (q, n, k, _, d) = parameter_set['sd']
+                mpc = parameter_set['threshold' if with_sss else 'hypercube']
+                point = {'q': q, 'n': n, 'k': k, 'd': d, 't': mpc[0], 'N': mpc[3]}
+                if with_sss:
+                    point['ell'] = mpc[5]
+                seeds.append(point)
+        if len(seeds) == 0:
+            seeds = [{}]
+
+        # Start from the best seed
+        points = [
+            tuple(
+                get_closest_index(key, point[key]) if key in point else len(space[key])-1
+                for key in keys
+            )
+            for point in seeds
+        ]
+        current = min(points, key=evaluate)
+        current_objective, _ = evaluate(current)
+        best = current
+        if current_objective < float('inf'):
+            temp = temperature * current_objective
+        else:
+            temp = 0
+
+        def is_better(point, reference):
+            (objective, is_feasible) = evaluate(point)
+            (ref_objective, ref_is_feasible) = evaluate(reference)
+            return (is_feasible, -objective) > (ref_is_feasible, -ref_objective)
+
+        # Simulated annealing: move one parameter at a time
+        start = time.monotonic()
+        iteration = 0
+        while iteration < max_iterations:
+            if (time_budget is not None) and (time.monotonic() - start >= time_budget):
+                break
+            iteration += 1
+
+            pos = rng.randrange(len(keys))
+            max_step = max(len(space[keys[pos]])//10, 2)
+            idx = current[pos] + rng.choice([-1, 1]) * rng.randint(1, max_step)
+            if not (0 <= idx < len(space[keys[pos]])):
+                continue
+            candidate = current[:pos] + (idx,) + current[pos+1:]
+            candidate_objective, _ = evaluate(candidate)
+
+            if current_objective == float('inf'):
+                # Random walk until reaching a point which can be evaluated
+                accept = True
+                if candidate_objective < float('inf'):
+                    temp = temperature * candidate_objective
+            else:
+                delta = candidate_objective - current_objective
+                accept = (delta <= 0) or (
+                    temp > 0 and delta < float('inf') and rng.random() < exp(-delta/temp)
+                )
+            if accept:
+                current, current_objective = candidate, candidate_objective
+                if is_better(current, best):
+                    best = current
+            temp *= cooling
+
+        # Confirm with an exhaustive search around the winner
+        confirmation = {
+            key: space[key][max(idx-window, 0):idx+window+1]
+            for key, idx in zip(keys, best)
+        }
+        return Search.run(with_sss=with_sss, top_k=top_k, **kwargs, **confirmation)
@@ -0,0 +1,224 @@
+from .isd import ISD
+from math import floor, ceil, isnan
+import struct
+import array
+import mmap
+import sys
+
+class ISDSurrogate:
+    """ Precomputed surface of the ISD cost (Peters) over (n, k, w) for a given field size q
+
+        The cost is tabulated on a regular grid, and the cost of an instance
+        inside the grid is estimated by multilinear interpolation. The multilinear
+        interpolation preserves the monotonicity of the tabulated values along
+        each axis. The error bound "bound" is the largest error measured at build
+        time on the centre of all the cells, multiplied by a safety factor.
+        It is an empirical bound, not a certified one: the ISD cost is a non-smooth
+        minimum over the parameters of the attack, so the error may be larger
+        elsewhere in a cell.
+
+        For this reason, "Search.run" does not use the interpolation, but the certified
+        upper bound "get_upper_bound": when n and k are grid nodes (step 1 by default),
+        the cost is bounded by the cost at the next node in w. This relies on the
+        monotonicity of the cost in w, which "build" checks on every weight of the range.
+
+        The surface is stored in a binary file which is memory-mapped when loaded,
+        so that loading it is instant whatever its size.
+
+      - q is the field size
+      - n_axis, k_axis, w_axis are the grid axes, as (start, step, count)
+      - values is a sequence of floats (nan when the cost is not defined),
+          indexed by ((i_n*count_k + i_k)*count_w + i_w)
+      - bound is the error bound on the interpolated cost (in bits)
+    """
+
+    MAGIC = b'SDITHISD'
+    HEADER_FORMAT = '<8sq9qd' # Magic, q, axes, bound (aligned on 8 bytes)
+
+    def __init__(self, q, n_axis, k_axis, w_axis, values, bound):
+        self.q = q
+        self.n_axis = tuple(n_axis)
+        self.k_axis = tuple(k_axis)
+        self.w_axis = tuple(w_axis)
+        self.values = values
+        self.bound = bound
+        self._mmap = None
+        self._path = None
+
+    def __reduce__(self):
+        # A loaded surface is mapped again from its file (for instance, in the
+        #   workers of "BatchSearch"), and a built one is sent with its values
+        if self._path is not None:
+            return (ISDSurrogate.load, (self._path,))
+        return (ISDSurrogate, (
+            self.q, self.n_axis, self.k_axis, self.w_axis, array.array('d', self.values), self.bound
+        ))
+
+    @staticmethod
+    def _get_axis(values_range, step):
+        values_range = list(values_range)
+        start, stop = min(values_range), max(values_range)
+        count = (stop - start + step - 1) // step + 1
+        return (start, step, max(count, 2))
+
+    @staticmethod
+    def _compute_cost(n, k, q, w):
+        if not (0 < k < n and 0 < w <= n-k):
+            return float('nan')
+        try:
+            return ISD.peters_isd(n, k, q, w)[0]
+        except (ValueError, ZeroDivisionError, OverflowError):
+            return float('nan')
+
+    @staticmethod
+    def build(q, n_range, k_range, w_range, steps=(1, 1, 2), safety_factor=2, min_bound=0.1):
+        """ Tabulate the ISD cost of all the grid nodes covering
+            "n_range" x "k_range" x "w_range" with the given "steps".
+            The error bound is max(safety_factor * measured_error, min_bound).
+
+            It checks that the cost is non-decreasing in w between the nodes of each
+            (n, k) node, on every weight (raise an AssertionError otherwise), so that
+            "get_upper_bound" is certified on the grid.
+        """
+        n_axis = ISDSurrogate._get_axis(n_range, steps[0])
+        k_axis = ISDSurrogate._get_axis(k_range, steps[1])
+        w_axis = ISDSurrogate._get_axis(w_range, steps[2])
+
+        values = array.array('d')
+        for i_n in range(n_axis[2]):
+            n = n_axis[0] + i_n*n_axis[1]
+            for i_k in range(k_axis[2]):
+                k = k_axis[0] + i_k*k_axis[1]
+                for i_w in range(w_axis[2]):
+                    w = w_axis[0] + i_w*w_axis[1]
+                    values.append(ISDSurrogate._compute_cost(n, k, q, w))
+        surrogate = ISDSurrogate(q, n_axis, k_axis, w_axis, values, 0.)
+
+        # Check the monotonicity in w, on every weight between two nodes
+        for i_n in range(n_axis[2]):
+            n = n_axis[0] + i_n*n_axis[1]
+            for i_k in range(k_axis[2]):
+                k = k_axis[0] + i_k*k_axis[1]
+                for i_w in range(1, w_axis[2]):
+                    w_hi = w_axis[0] + i_w*w_axis[1]
+                    upper = values[(i_n*k_axis[2] + i_k)*w_axis[2] + i_w]
+                    if isnan(upper):
+                        continue
+                    for w in range(w_hi - w_axis[1] + 1, w_hi):
+                        cost = ISDSurrogate._compute_cost(n, k, q, w)
+                        assert isnan(cost) or cost <= upper, \
+                            'The ISD cost is not monotone in w: (n,k,w)=({},{},{})'.format(n, k, w)
+
+        # Measure the interpolation error on the centre of each cell
+        max_error = 0.
+        for i_n in range(n_axis[2]-1):
+            n = n_axis[0] + i_n*n_axis[1] + n_axis[1]//2
+            for i_k in range(k_axis[2]-1):
+                k = k_axis[0] + i_k*k_axis[1] + k_axis[1]//2
+                for i_w in range(w_axis[2]-1):
+                    w = w_axis[0] + i_w*w_axis[1] + w_axis[1]//2
+                    estimate = surrogate.get_cost(n, k, w)
+                    if estimate is None:
+                        continue
+                    exact = ISDSurrogate._compute_cost(n, k, q, w)
+                    if isnan(exact):
+                        continue
+                    max_error = max(max_error, abs(estimate - exact))
+        surrogate.bound = max(safety_factor*max_error, min_bound)
+        return surrogate
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(struct.pack(
+                self.HEADER_FORMAT, self.MAGIC, self.q,
+                *self.n_axis, *self.k_axis, *self.w_axis,
+                self.bound
+            ))
+            values = array.array('d', self.values)
+            if sys.byteorder != 'little':
+                values.byteswap()
+            f.write(values.tobytes())
+
+    @staticmethod
+    def load(path):
+        """ Load a surface saved with "save", without reading it in memory """
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        header = struct.unpack_from(ISDSurrogate.HEADER_FORMAT, mm, 0)
+        assert header[0] == ISDSurrogate.MAGIC, 'Invalid ISD surrogate file: {}'.format(path)
+        q = header[1]
+        n_axis, k_axis, w_axis = header[2:5], header[5:8], header[8:11]
+        bound = header[11]
+
+        offset = struct.calcsize(ISDSurrogate.HEADER_FORMAT)
+        if sys.byteorder == 'little':
+            values = memoryview(mm)[offset:].cast('d')
+        else:
+            values = array.array('d', mm[offset:])
+            values.byteswap()
+        surrogate = ISDSurrogate(q, n_axis, k_axis, w_axis, values, bound)
+        surrogate._mmap = mm
+        surrogate._path = path
+        return surrogate
+
+    @staticmethod
+    def _locate(value, axis):
+        """ Return (index of the cell, position in the cell), or None if outside the axis """
+        start, step, count = axis
+        pos = (value - start) / step
+        if pos < 0 or pos > count-1:
+            return None
+        idx = min(floor(pos), count-2)
+        return idx, pos - idx
+
+    def get_cost(self, n, k, w):
+        """ Return the interpolated ISD cost, or None if (n, k, w)
+            is outside the grid or too close to an undefined value
+        """
+        loc_n = self._locate(n, self.n_axis)
+        loc_k = self._locate(k, self.k_axis)
+        loc_w = self._locate(w, self.w_axis)
+        if loc_n is None or loc_k is None or loc_w is None:
+            return None
+        (i_n, f_n), (i_k, f_k), (i_w, f_w) = loc_n, loc_k, loc_w
+        count_k, count_w = self.k_axis[2], self.w_axis[2]
+
+        cost = 0.
+        for d_n, c_n in ((0, 1-f_n), (1, f_n)):
+            for d_k, c_k in ((0, 1-f_k), (1, f_k)):
+                for d_w, c_w in ((0, 1-f_w), (1, f_w)):
+                    coeff = c_n*c_k*c_w
+                    if coeff == 0:
+                        continue
+                    value = self.values[((i_n+d_n)*count_k + (i_k+d_k))*count_w + (i_w+d_w)]
+                    if isnan(value):
+                        return None
+                    cost += coeff*value
+        return cost
+
+    def get_upper_bound(self, n, k, w):
+        """ Return an upper bound on the ISD cost, which is the cost of the next node
+            in w, or None if n or k is not a grid node, or if (n, k, w) is outside the grid
+            or the cost of the node is undefined
+        """
+        def get_node(value, axis):
+            start, step, count = axis
+            if (value - start) % step != 0 or not (0 <= (value - start) // step < count):
+                return None
+            return (value - start) // step
+        i_n = get_node(n, self.n_axis)
+        i_k = get_node(k, self.k_axis)
+        start, step, count = self.w_axis
+        i_w = ceil((w - start) / step)
+        if i_n is None or i_k is None or not (0 <= i_w < count):
+            return None
+        value = self.values[(i_n*self.k_axis[2] + i_k)*count + i_w]
+        return None if isnan(value) else value
+
+    @staticmethod
+    def find(surrogates, q):
+        """ Return the surrogate for the field size q in a list, or None """
+        for surrogate in surrogates or []:
+            if surrogate.q == q:
+                return surrogate
+        return None
@@ -0,0 +1,174 @@
+from .sdp import SyndromeDecoding
+from .search import Search
+from bisect import bisect_left
+from math import floor
+import csv
+
+class SweepResult:
+    """ Result of a sensitivity sweep (see "SensitivitySweep.run")
+
+      - entries is the list of (isd_cost, orders, results) for each SD instance
+          of the grid, where "orders" is a dictionary {nb_additional: rank} with the
+          rank of the instance in the order of "Search.run", for the values of
+          "nb_additional" for which the weight of the instance is in the search range,
+          and "results" is a dictionary {kappa: SearchResult or None} with the
+          minimal size achievable on top of the instance
+    """
+    def __init__(self, entries, nb_additionals, kappas):
+        self.entries = entries
+        self.nb_additionals = list(nb_additionals)
+        self.kappas = list(kappas)
+        self._curves = {}
+
+    def _get_running_minima(self, nb_additional, kappa):
+        """ Return (costs, minima) where "costs" are the ISD costs sorted in
+            increasing order, and minima[i] is the best result among
+            the instances with an ISD cost at least costs[i]
+        """
+        key = (nb_additional, kappa)
+        if key not in self._curves:
+            entries = sorted([
+                (cost, orders[nb_additional], results[kappa])
+                for cost, orders, results in self.entries
+                if nb_additional in orders and results[kappa] is not None
+            ], key=lambda entry: -entry[0])
+
+            # Running minima, from the largest ISD cost to the smallest one. The ties
+            #   are broken as in "Search.run": higher score, then first in the search order.
+            def get_key(order, result):
+                return (result.get_size(), -result.score, order)
+            costs, minima = [], []
+            best, best_key = None, None
+            for cost, order, result in entries:
+                key = get_key(order, result)
+                if best is None or key < best_key:
+                    best, best_key = result, key
+                costs.append(cost)
+                minima.append(best)
+            costs.reverse()
+            minima.reverse()
+            self._curves[key] = (costs, minima)
+        return self._curves[key]
+
+    def get_best(self, lda, nb_additional=None, kappa=None):
+        """ Return the best "SearchResult" whose ISD cost is at least "lda", or None """
+        nb_additional = self.nb_additionals[0] if nb_additional is None else nb_additional
+        kappa = self.kappas[0] if kappa is None else kappa
+        costs, minima = self._get_running_minima(nb_additional, kappa)
+        # Index of the first instance with an ISD cost at least "lda"
+        idx = bisect_left(costs, lda)
+        if idx >= len(costs):
+            return None
+        return minima[idx]
+
+    def get_curve(self, ldas, nb_additional=None, kappa=None):
+        """ Return the list of (lda, best SearchResult or None) """
+        return [(lda, self.get_best(lda, nb_additional, kappa)) for lda in ldas]
+
+    def get_rows(self, ldas):
+        """ Return the best-size-vs-threshold curves of all (nb_additional, kappa)
+            as a list of dictionaries
+        """
+        rows = []
+        for nb_additional in self.nb_additionals:
+            for kappa in self.kappas:
+                for lda, result in self.get_curve(ldas, nb_additional, kappa):
+                    row = {'lda': lda, 'nb_additional': nb_additional, 'kappa': kappa}
+                    if result is not None:
+                        row['size'] = result.get_size()
+                        row.update(result.get_parameters())
+                    rows.append(row)
+        return rows
+
+    def print_table(self, ldas):
+        text = ['{:>8} {:>13} {:>6} {:>8}  {}'.format('lda', 'nb_additional', 'kappa', 'size', 'parameters')]
+        for row in self.get_rows(ldas):
+            parameters = '-' if 'size' not in row else '(q,n,k,w,d)=({q},{n},{k},{w},{d}), t={t}, N={N}, tau={tau}'.format(**row)
+            text.append('{:>8} {:>13} {:>6} {:>8}  {}'.format(
+                row['lda'], '{:g}'.format(row['nb_additional']), row['kappa'], row.get('size', '-'), parameters
+            ))
+        print('\n'.join(text))
+
+    def write_csv(self, path, ldas):
+        fields = ['lda', 'nb_additional', 'kappa', 'size', 'q', 'n', 'k', 'w', 'd', 't', 'ext1', 'ext2', 'N', 'tau', 'ell']
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(self.get_rows(ldas))
+
+
+class SensitivitySweep:
+
+    @staticmethod
+    def run(nb_additional=(1/100,), kappa=128, with_sss=False, **kwargs):
+        """ Sweep the (q, n, k, w) grid once and record, for each SD instance,
+            its ISD cost and the minimal signature size achievable on top of it.
+            The result answers the best size for any minimal ISD cost "lda"
+            (see "SweepResult.get_curve"), without running one search per value.
+
+            - nb_additional is a list of ratios defining the GV weight (see "Search.run")
+            - kappa is a security level or a list of security levels
+
+            The other parameters are those of "Search.run" (except "lda"):
+            q, n, k, w, d must be integers or static lists, and the remaining ones
+            (ext1, ext2, t, N, ell, tau, size_metric, ...) are passed to "Search.run"
+            to compute the minimal size of each instance.
+
+            Example:
+
+                result = SensitivitySweep.run(
+                    nb_additional=[1/100, 1/10],
+                    kappa=128, q=251, n=range(220,250), k=range(115,140), w=range(-3,1),
+                    N=256, ext1=1, ext2=4, t=[3,4,5]
+                )
+                result.print_table(ldas=range(140,151))
+        """
+        def as_list(value):
+            return [value] if isinstance(value, (int, float)) else list(value)
+
+        nb_additionals = as_list(nb_additional)
+        kappas = as_list(kappa)
+        qs = as_list(kwargs.pop('q', 256))
+        ns = as_list(kwargs.pop('n'))
+        ks = as_list(kwargs.pop('k'))
+        ws = as_list(kwargs.pop('w', [-1]))
+        ds = as_list(kwargs.pop('d', 1))
+        assert 'lda' not in kwargs, 'The sweep covers all the values of "lda"'
+
+        # List the SD instances, with their rank in the order of "Search.run"
+        #   for each value of "nb_additional" for which they are in the search range
+        instances = {}
+        ranks = {ratio: 0 for ratio in nb_additionals}
+        for q in qs:
+            for n in ns:
+                for d in ds:
+                    if n % d != 0:
+                        continue
+                    for k in ks:
+                        for ratio in nb_additionals:
+                            gv = floor(SyndromeDecoding.compute_max_weigth_for_target(q, n, k, ratio))
+                            for w in ws:
+                                w = w + gv if w <= 0 else w
+                                if w <= 0 or w % d != 0:
+                                    continue
+                                instances.setdefault((q, n, d, k, w), {})[ratio] = ranks[ratio]
+                                ranks[ratio] += 1
+
+        entries = []
+        hint = None
+        for (q, n, d, k, w), orders in instances.items():
+            sd = SyndromeDecoding(q, n, k, w, d, isd_hint=hint)
+            cost = sd.get_isd_cost()
+            hint = sd.get_cost_peters_isd(with_parameters=True)[1]
+
+            results = {}
+            for kap in kappas:
+                best = Search.run(
+                    with_sss=with_sss, kappa=kap, lda=float('-inf'),
+                    q=q, n=n, d=d, k=k, w=[w],
+                    estimate_peters_isd=False, estimate_lee_brickell_isd=False,
+                    top_k=1, **kwargs
+                )
+                results[kap] = best[0] if len(best) > 0 else None
+            entries.append((cost, orders, results))
+        return SweepResult(entries, nb_additionals, kappas)
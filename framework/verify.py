@@ -0,0 +1,448 @@
+from .isd import ISD
+from .sdp import SyndromeDecoding
+from .sdith_hypercube import HypercubeSDitH
+from .sdith_threshold import ThresholdSDitH, BinaryTree
+from .reference import Reference
+from .chosen import CHOSEN_PARAMETER_SETS
+from math import ceil, log2
+from math import comb as binomial
+import random
+
+class VerificationReport:
+    """ Outcome of a differential check between a fast path and its reference
+
+      - name is the name of the check
+      - nb_checks is the number of compared inputs
+      - max_deviation is the maximal deviation between the two numerical outputs
+      - mismatches is the list of (inputs, reason) for which the outputs differ
+          by more than the tolerance, or lead to a different decision
+      - nb_recovered is the number of inputs for which the reference raises
+          an exception that the fast path is allowed to fix (see "Verification.compare")
+    """
+    def __init__(self, name):
+        self.name = name
+        self.nb_checks = 0
+        self.max_deviation = 0.
+        self.mismatches = []
+        self.nb_recovered = 0
+
+    def is_ok(self):
+        return len(self.mismatches) == 0
+
+    def print(self, max_mismatches=10):
+        text = []
+        text.append('[{}] {}: {} checks, max deviation={:.3g}, {} mismatch(es)'.format(
+            'OK' if self.is_ok() else 'FAIL',
+            self.name,
+            self.nb_checks,
+            self.max_deviation,
+            len(self.mismatches)
+        ))
+        if self.nb_recovered > 0:
+            text.append(' - {} reference exception(s) fixed by the fast path'.format(self.nb_recovered))
+        for inputs, reason in self.mismatches[:max_mismatches]:
+            text.append(' - {}: {}'.format(inputs, reason))
+        if len(self.mismatches) > max_mismatches:
+            text.append(' - ...')
+        print('\n'.join(text))
+
+
+class Verification:
+    """ Differential verification of the fast paths against the reference implementations
+
+        Each check runs a fast path (by default, the current implementation of the
+        framework) and its frozen reference (see "reference.py") over a grid of inputs.
+        It reports the maximal numerical deviation and any decision flip
+        (feasible/infeasible, chosen weight, chosen number of repetitions, ...).
+        If the reference raises an exception, the fast path must raise the same one.
+    """
+
+    # Minimal ISD costs used for the categories I, III and V
+    LDAS = (143, 207, 272)
+    KAPPAS = (128, 192, 256)
+
+    @staticmethod
+    def compare(name, fast, reference, inputs, get_value=None, get_decisions=None,
+            tolerance=1e-9, prepare=None, recover=()):
+        """ Compare "fast" and "reference" on each tuple of "inputs"
+
+            - get_value maps an output to the number whose deviation is measured
+            - get_decisions maps an output to a dictionary of decisions
+                which must be identical for both implementations
+            - prepare is called before each evaluation (for instance, to seed a PRNG)
+            - recover is a tuple of the exception types of the reference which
+                the fast path is allowed to fix (by returning a value instead)
+        """
+        report = VerificationReport(name)
+
+        def evaluate(function, args):
+            if prepare is not None:
+                prepare()
+            try:
+                return function(*args), None
+            except Exception as e:
+                return None, type(e)
+
+        for args in inputs:
+            report.nb_checks += 1
+            ref_out, ref_exc = evaluate(reference, args)
+            fast_out, fast_exc = evaluate(fast, args)
+            if ref_exc is not None and fast_exc is None and issubclass(ref_exc, recover):
+                report.nb_recovered += 1
+                continue
+            if ref_exc is not None or fast_exc is not None:
+                if ref_exc != fast_exc:
+                    report.mismatches.append((args, 'exception: reference={}, fast={}'.format(
+                        ref_exc.__name__ if ref_exc else None,
+                        fast_exc.__name__ if fast_exc else None,
+                    )))
+                continue
+
+            if get_value is not None:
+                deviation = abs(get_value(fast_out) - get_value(ref_out))
+                report.max_deviation = max(report.max_deviation, deviation)
+                if deviation > tolerance:
+                    report.mismatches.append((args, 'deviation of {:.3g}'.format(deviation)))
+                    continue
+
+            if get_decisions is not None:
+                ref_decisions = get_decisions(ref_out)
+                fast_decisions = get_decisions(fast_out)
+                for key in ref_decisions:
+                    if ref_decisions[key] != fast_decisions[key]:
+                        report.mismatches.append((args, '{} flipped: reference={}, fast={}'.format(
+                            key, ref_decisions[key], fast_decisions[key]
+                        )))
+        return report
+
+    @staticmethod
+    def get_min_tau(forgery_cost, p, N, kappa, max_tau=200):
+        """ Minimal number of repetitions such that the forgery cost
+            is above kappa bits (as in the default rule of "Search.run")
+        """
+        tau = max(ceil(kappa / log2(N)), 1)
+        while forgery_cost(p, N, tau) < kappa:
+            tau += 1
+            if tau > max_tau:
+                return None
+        return tau
+
+    ### Grids
+
+    @staticmethod
+    def get_chosen_sd_instances():
+        return [parameter_set['sd'] for parameter_set in CHOSEN_PARAMETER_SETS]
+
+    @staticmethod
+    def get_chosen_tradeoffs():
+        """ Return the list of (p, N, kappa) of the chosen parameter sets,
+            where (p, N) are the inputs of the forgery cost
+        """
+        tradeoffs = []
+        for parameter_set in CHOSEN_PARAMETER_SETS:
+            (q, n, _, w, d) = parameter_set['sd']
+            kappa = parameter_set['kappa']
+
+            (t, ext1, ext2, N, _) = parameter_set['hypercube']
+            p = HypercubeSDitH._compute_false_positive_probability(q, n, w, d, t, ext1, ext2)
+            tradeoffs.append((p, N, kappa))
+
+            (t, ext1, ext2, N, _, ell) = parameter_set['threshold']
+            p = HypercubeSDitH._compute_false_positive_probability(q, n, w, d, t, ext1, ext2)
+            tradeoffs.append((p*binomial(N, ell+1), binomial(N, ell), kappa))
+        return tradeoffs
+
+    @staticmethod
+    def get_isd_grid(seed=0, nb_random=100):
+        """ Return a list of (n, k, q, w) """
+        rng = random.Random(seed)
+        grid = []
+
+        # Chosen parameter sets
+        for (q, n, k, w, _) in Verification.get_chosen_sd_instances():
+            grid.append((n, k, q, w))
+
+        # Boundary instances: tiny dimensions, tiny weights and weights around GV
+        for q in (2, 3, 251, 256):
+            for (n, k) in [(8, 4), (9, 5), (24, 12), (64, 32), (230, 126), (500, 280)]:
+                gv = Reference.compute_max_weigth_for_target(q, n, k)
+                for w in sorted(set([1, 2, max(gv-1, 1), max(gv, 1), gv+1, n-k])):
+                    grid.append((n, k, q, w))
+
+        # Random instances
+        for _ in range(nb_random):
+            q = rng.choice([3, 16, 251, 256])
+            n = rng.randint(20, 600)
+            k = rng.randint(n//4, (3*n)//4)
+            gv = Reference.compute_max_weigth_for_target(q, n, k)
+            w = rng.randint(max(gv-10, 1), max(gv+2, 1))
+            grid.append((n, k, q, w))
+        return grid
+
+    @staticmethod
+    def get_max_weight_grid(seed=0, nb_random=100):
+        """ Return a list of (q, n, k, ratio) """
+        rng = random.Random(seed)
+        grid = []
+        for (q, n, k, _, _) in Verification.get_chosen_sd_instances():
+            grid.append((q, n, k, 1/100))
+        for q in (2, 3, 251, 256):
+            for (n, k) in [(2, 1), (8, 4), (24, 12), (230, 126), (500, 280)]:
+                for ratio in (1, 1/100, 1e-6):
+                    grid.append((q, n, k, ratio))
+        for _ in range(nb_random):
+            q = rng.choice([3, 16, 251, 256])
+            n = rng.randint(10, 1000)
+            k = rng.randint(1, n-1)
+            ratio = rng.choice([1, 1/10, 1/100, 1/1000])
+            grid.append((q, n, k, ratio))
+        return grid
+
+    @staticmethod
+    def get_forgery_grid(seed=0, nb_random=100):
+        """ Return a list of (p, N, kappa) """
+        rng = random.Random(seed)
+        grid = list(Verification.get_chosen_tradeoffs())
+        for kappa in Verification.KAPPAS:
+            for N in (16, 251, 256, binomial(251, 3)):
+                for p in (0., 2**-1074, 2**-600, 2**-kappa, 2**-40, 2**-8):
+                    grid.append((p, N, kappa))
+        for _ in range(nb_random):
+            kappa = rng.choice(Verification.KAPPAS)
+            N = rng.choice([4, 32, 251, 256, binomial(251, 2), binomial(256, 3)])
+            p = 2**(-rng.uniform(1, 400))
+            grid.append((p, N, kappa))
+        return grid
+
+    @staticmethod
+    def get_threshold_grid(max_t=16):
+        """ Return a list of (p, N, ell, kappa) for the SD instances and the trade-offs
+            of the chosen threshold parameter sets, with all the values of t up to "max_t"
+            (except those for which the conservative bound p*binomial(N, ell+1) is
+            at least one, where the reference is not defined)
+        """
+        grid = []
+        for parameter_set in CHOSEN_PARAMETER_SETS:
+            (q, n, _, w, d) = parameter_set['sd']
+            (_, ext1, ext2, N, _, ell) = parameter_set['threshold']
+            for t in range(1, max_t+1):
+                p = HypercubeSDitH._compute_false_positive_probability(q, n, w, d, t, ext1, ext2)
+                if p*binomial(N, ell+1) < 1:
+                    grid.append((p, N, ell, parameter_set['kappa']))
+        return grid
+
+    @staticmethod
+    def get_nb_leaves_grid(seed=0, nb_random=10):
+        """ Return a list of (nb_revealed, nb_committed) """
+        rng = random.Random(seed)
+        grid = []
+        for parameter_set in CHOSEN_PARAMETER_SETS:
+            (_, _, _, N, _, ell) = parameter_set['threshold']
+            grid.append((N-ell, N))
+        for N in (2, 3, 16, 251, 256):
+            for nb_revealed in sorted(set([0, 1, N//2, N-1, N])):
+                grid.append((nb_revealed, N))
+        for _ in range(nb_random):
+            N = rng.randint(2, 256)
+            grid.append((rng.randint(0, N), N))
+        return grid
+
+    ### Checks
+
+    @staticmethod
+    def check_peters_isd(fast=None, grid=None, tolerance=1e-9):
+        """ Check a fast path of "ISD.peters_isd", with the same signature """
+        fast = fast or ISD.peters_isd
+        grid = grid if grid is not None else Verification.get_isd_grid()
+        def get_decisions(out):
+            decisions = {'optimum (p,l)': out[1:]}
+            for lda in Verification.LDAS:
+                decisions['feasible for lda={}'.format(lda)] = (out[0] >= lda)
+            return decisions
+        return Verification.compare(
+            'ISD.peters_isd', fast, Reference.peters_isd, grid,
+            get_value=lambda out: out[0],
+            get_decisions=get_decisions,
+            tolerance=tolerance,
+        )
+
+    @staticmethod
+    def check_peters_isd_warm_start(grid=None, seed=0, tolerance=0):
+        """ Check that the warm start of "ISD.peters_isd" gives the same outputs
+            as the full scan, for extreme, random and neighbouring hints
+        """
+        grid = grid if grid is not None else Verification.get_isd_grid()
+        rng = random.Random(seed)
+        inputs = []
+        for (n, k, q, w) in grid:
+            hints = [(1, 1), (10, 40), (rng.randint(1, 10), rng.randint(1, 30))]
+            try:
+                hints.append(Reference.peters_isd(n, k, q, w-1)[1:])
+            except Exception:
+                pass
+            for hint in hints:
+                inputs.append((n, k, q, w, hint))
+        return Verification.compare(
+            'ISD.peters_isd (warm start)',
+            lambda n, k, q, w, hint: ISD.peters_isd(n, k, q, w, hint=hint),
+            lambda n, k, q, w, hint: Reference.peters_isd(n, k, q, w),
+            inputs,
+            get_value=lambda out: out[0],
+            get_decisions=lambda out: {'optimum (p,l)': out[1:]},
+            tolerance=tolerance,
+        )
+
+    @staticmethod
+    def check_max_weight(fast=None, grid=None):
+        """ Check a fast path of "SyndromeDecoding.compute_max_weigth_for_target" """
+        fast = fast or SyndromeDecoding.compute_max_weigth_for_target
+        grid = grid if grid is not None else Verification.get_max_weight_grid()
+        return Verification.compare(
+            'SyndromeDecoding.compute_max_weigth_for_target', fast,
+            Reference.compute_max_weigth_for_target, grid,
+            get_value=lambda out: out,
+            get_decisions=lambda out: {'chosen w': out},
+            tolerance=0,
+        )
+
+    @staticmethod
+    def check_forgery_cost(fast=None, grid=None, max_tau=60, tolerance=1e-9):
+        """ Check a fast path of "HypercubeSDitH._compute_forgery_cost" on all tau up to "max_tau"
+
+            The reference saturates at 512 bits (and may overflow beyond), so the
+            costs are compared up to 512 bits, and the fast path is allowed to
+            succeed where the reference overflows.
+        """
+        fast = fast or HypercubeSDitH._compute_forgery_cost
+        grid = grid if grid is not None else Verification.get_forgery_grid()
+        inputs = [
+            (p, N, tau)
+            for (p, N, _) in grid
+            for tau in range(1, max_tau+1)
+        ]
+        def get_decisions(out):
+            return {
+                'feasible for kappa={}'.format(kappa): (out >= kappa)
+                for kappa in Verification.KAPPAS
+            }
+        return Verification.compare(
+            'HypercubeSDitH._compute_forgery_cost', fast, Reference.compute_forgery_cost, inputs,
+            get_value=lambda out: min(out, 512),
+            get_decisions=get_decisions,
+            tolerance=tolerance,
+            recover=(OverflowError,),
+        )
+
+    @staticmethod
+    def check_min_tau(fast=None, grid=None, max_tau=200):
+        """ Check the chosen number of repetitions
+
+            "fast" takes (p, N, kappa) and returns the minimal tau. By default,
+            it is "HypercubeSDitH.compute_min_tau", called once per (N, kappa)
+            with all the probabilities of the grid. The log-space kernel is allowed
+            to succeed where the reference overflows.
+        """
+        grid = grid if grid is not None else Verification.get_forgery_grid()
+        if fast is None:
+            ps = {}
+            for (p, N, kappa) in grid:
+                ps.setdefault((N, kappa), []).append(p)
+            min_taus = {}
+            for (N, kappa), lst in ps.items():
+                taus = range(max(ceil(kappa / log2(N)), 1), max_tau+1)
+                for p, tau in zip(lst, HypercubeSDitH.compute_min_tau(lst, N, kappa, taus)):
+                    min_taus[(p, N, kappa)] = tau
+            fast = lambda p, N, kappa: min_taus[(p, N, kappa)]
+        reference = lambda p, N, kappa: Verification.get_min_tau(
+            Reference.compute_forgery_cost, p, N, kappa, max_tau
+        )
+        return Verification.compare(
+            'chosen tau', fast, reference, grid,
+            get_decisions=lambda out: {'chosen tau': out},
+            recover=(OverflowError,),
+        )
+
+    @staticmethod
+    def check_min_tau_consistency(grid=None, max_tau=200):
+        """ Check that "HypercubeSDitH.compute_min_tau" agrees with the forgery cost
+            reported by the variants ("HypercubeSDitH._compute_forgery_cost"),
+            without allowing any exception
+        """
+        grid = grid if grid is not None else Verification.get_forgery_grid()
+        fast = lambda p, N, kappa: HypercubeSDitH.compute_min_tau(
+            [p], N, kappa, range(max(ceil(kappa / log2(N)), 1), max_tau+1)
+        )[0]
+        reference = lambda p, N, kappa: Verification.get_min_tau(
+            HypercubeSDitH._compute_forgery_cost, p, N, kappa, max_tau
+        )
+        return Verification.compare(
+            'chosen tau vs signature security', fast, reference, grid,
+            get_decisions=lambda out: {'chosen tau': out},
+        )
+
+    @staticmethod
+    def check_min_tau_threshold(grid=None, max_tau=200):
+        """ Check "ThresholdSDitH.compute_min_tau", called once per (N, ell, kappa)
+            with the probabilities of all the values of t
+        """
+        grid = grid if grid is not None else Verification.get_threshold_grid()
+        ps = {}
+        for (p, N, ell, kappa) in grid:
+            ps.setdefault((N, ell, kappa), []).append(p)
+        min_taus = {}
+        for (N, ell, kappa), lst in ps.items():
+            taus = range(max(ceil(kappa / log2(binomial(N, ell))), 1), max_tau+1)
+            for p, tau in zip(lst, ThresholdSDitH.compute_min_tau(lst, N, ell, kappa, taus)):
+                min_taus[(p, N, ell, kappa)] = tau
+
+        fast = lambda p, N, ell, kappa: min_taus[(p, N, ell, kappa)]
+        reference = lambda p, N, ell, kappa: Verification.get_min_tau(
+            Reference.compute_forgery_cost, p*binomial(N, ell+1), binomial(N, ell), kappa, max_tau
+        )
+        return Verification.compare(
+            'chosen tau (threshold)', fast, reference, grid,
+            get_decisions=lambda out: {'chosen tau': out},
+            recover=(OverflowError,),
+        )
+
+    @staticmethod
+    def check_nb_leaves(fast=None, grid=None, nb_experiments=1000, seed=0, tolerance=0.5):
+        """ Check a fast path of "BinaryTree.get_nb_leaves"
+
+            The fast path is the exact expectation, and the reference is a Monte-Carlo
+            estimate (with a PRNG seeded before each evaluation), so the tolerance
+            matches the Monte-Carlo noise.
+        """
+        fast = fast or BinaryTree.get_nb_leaves
+        grid = grid if grid is not None else Verification.get_nb_leaves_grid()
+        reference = lambda nb_revealed, N: Reference.get_nb_leaves(nb_revealed, N, nb_experiments)
+        return Verification.compare(
+            'BinaryTree.get_nb_leaves', fast, reference, grid,
+            get_value=lambda out: out,
+            tolerance=tolerance,
+            prepare=lambda: random.seed(seed),
+        )
+
+    @staticmethod
+    def run_all(seed=0, nb_random=100, verbose=True):
+        """ Run all the checks with the current implementations of the framework
+            and raise an AssertionError if one of them fails
+        """
+        reports = [
+            Verification.check_peters_isd(grid=Verification.get_isd_grid(seed, nb_random)),
+            Verification.check_peters_isd_warm_start(grid=Verification.get_isd_grid(seed, nb_random), seed=seed),
+            Verification.check_max_weight(grid=Verification.get_max_weight_grid(seed, nb_random)),
+            Verification.check_forgery_cost(grid=Verification.get_forgery_grid(seed, nb_random)),
+            Verification.check_min_tau(grid=Verification.get_forgery_grid(seed, nb_random)),
+            Verification.check_min_tau_consistency(grid=Verification.get_forgery_grid(seed, nb_random)),
+            Verification.check_min_tau_threshold(),
+            Verification.check_nb_leaves(seed=seed),
+        ]
+        if verbose:
+            for report in reports:
+                report.print()
+        failed = [report.name for report in reports if not report.is_ok()]
+        # Explicit raise (not an assert): the check must not be stripped by "python -O"
+        if len(failed) > 0:
+            raise AssertionError('Mismatch with the reference implementations: {}'.format(failed))
+        return reports
@@ -0,0 +1,22 @@
+import argparse
+from framework import BatchSearch
+from framework import print_title
+
+parser = argparse.ArgumentParser(description='Run several parameter searches on a shared pool of workers.')
+parser.add_argument('config', help='JSON file with the list of search specifications')
+parser.add_argument('-o', '--output', default='results.json', help='output file (.json or .csv)')
+parser.add_argument('-j', '--workers', type=int, default=None, help='number of worker processes (default: all the CPUs)')
+parser.add_argument('-k', '--top-k', type=int, default=1, help='number of parameter sets kept per search')
+args = parser.parse_args()
+if args.top_k < 1:
+    parser.error('--top-k must be at least 1')
+
+specs = BatchSearch.load_specs(args.config)
+results = BatchSearch.run(specs, workers=args.workers, top_k=args.top_k)
+BatchSearch.write_results(BatchSearch.to_rows(specs, results), args.output)
+
+for spec, spec_results in zip(specs, results):
+    print_title(str(spec.get('name', '')))
+    print()
+    for result in spec_results:
+        result.get_variant().print(with_sd_hardness=True, in_bytes=True)
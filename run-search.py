@@ -1,69 +1,66 @@
-from framework import Search
+import argparse
+import sys
+from framework import BatchSearch, Profiler
 from framework import print_title
 
 q = 251
 ws = range(-3,0+1)
 nb_additional = 1/100
-get_score = lambda x: 0
 
-### Search for 128-bit security
-print_title('Parameter set for 128-bit security')
-print()
-print('======  Hypercube variant  ======')
-size, variant = Search.run(
-    kappa=128,
-    lda=143,
-    q=q,
-    n=range(220,250),
-    k=range(115,140),
-    w=ws,
-    N=256,
-    ext1=1,
-    ext2=4,
-    t=[3,4,5],
-    nb_additional=nb_additional,
-    get_score=get_score,
-)
-variant.print(with_sd_hardness=True,in_bytes=True)
+# Search space of each security category
+CATEGORIES = {
+    'I': dict(kappa=128, lda=143, n=range(220,250), k=range(115,140), d=1),
+    'III': dict(kappa=192, lda=207, n=range(340,390), k=range(180,240), d=2),
+    'V': dict(kappa=256, lda=272, n=range(460,502+1), k=range(250,290), d=2),
+}
+# Parameters of each variant
+VARIANTS = {
+    'hypercube': dict(N=256, t=[3,4,5]),
+    'threshold': dict(N=q, ell=3, t=range(6,15)),
+}
 
-### Search for 192-bit security
-print_title('Parameter set for 192-bit security')
-print()
-print('======  Hypercube variant  ======')
-size, variant = Search.run(
-    kappa=192,
-    lda=207,
-    q=q,
-    n=range(340,390),
-    k=range(180,240),
-    w=ws,
-    d=2,
-    N=256,
-    ext1=1,
-    ext2=4,
-    t=[3,4,5],
-    nb_additional=nb_additional,
-    get_score=get_score,
-)
-variant.print(with_sd_hardness=True,in_bytes=True)
+parser = argparse.ArgumentParser(description='Search the SDitH parameter sets minimizing the signature size.')
+parser.add_argument('-c', '--category', nargs='+', choices=list(CATEGORIES), default=list(CATEGORIES),
+    help='security categories to search (default: all)')
+parser.add_argument('-v', '--variant', nargs='+', choices=list(VARIANTS), default=['hypercube'],
+    help='variants to search (default: hypercube)')
+parser.add_argument('-j', '--workers', type=int, default=1,
+    help='number of worker processes (default: 1, profiling only covers the main process)')
+parser.add_argument('-f', '--format', choices=['text', 'json', 'csv'], default='text',
+    help='output format (default: text)')
+parser.add_argument('--profile', action='store_true',
+    help='print a cProfile/tracemalloc summary of ISD, SyndromeDecoding, Search and BinaryTree')
+parser.add_argument('--stats', action='store_true',
+    help='print the time spent in each function of the framework')
+args = parser.parse_args()
 
-### Search for 256-bit security
-print_title('Parameter set for 256-bit security')
-print()
-print('======  Hypercube variant  ======')
-size, variant = Search.run(
-    kappa=256,
-    lda=272,
-    q=q,
-    n=range(460,502+1),
-    k=range(250,290),
-    w=ws,
-    d=2,
-    N=256,
-    ext1=1,
-    ext2=4,
-    t=[3,4,5],
-    nb_additional=nb_additional,
-    get_score=get_score,
-)
-variant.print(with_sd_hardness=True,in_bytes=True)
+specs = []
+for category in args.category:
+    for variant in args.variant:
+        spec = dict(
+            name=category,
+            variant=variant,
+            q=q,
+            w=ws,
+            ext1=1,
+            ext2=4,
+            nb_additional=nb_additional,
+        )
+        spec.update(CATEGORIES[category])
+        spec.update(VARIANTS[variant])
+        specs.append(spec)
+
+# Keep stdout for the results when they are machine-readable
+stream = sys.stdout if args.format == 'text' else sys.stderr
+with Profiler(profile=args.profile, stats=args.stats, stream=stream):
+    results = BatchSearch.run(specs, workers=args.workers)
+
+    if args.format == 'text':
+        for spec, spec_results in zip(specs, results):
+            print_title('Parameter set for {}-bit security'.format(spec['kappa']))
+            print()
+            print('======  {} variant  ======'.format(spec['variant'].capitalize()))
+            for result in spec_results:
+                result.get_variant().print(with_sd_hardness=True,in_bytes=True)
+    else:
+        BatchSearch.dump_results(BatchSearch.to_rows(specs, results), sys.stdout, args.format)
@@ -0,0 +1,12 @@
+import sys
+from framework import Verification
+from framework import print_title
+
+print_title('Fast paths vs reference implementations')
+print()
+try:
+    Verification.run_all(seed=0, nb_random=100)
+except AssertionError as e:
+    print()
+    print(e)
+    sys.exit(1)